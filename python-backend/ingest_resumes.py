@@ -0,0 +1,163 @@
+"""Bulk resume ingestion.
+
+Parses every resume in a directory with a process pool and streams one NDJSON
+record per file as soon as it finishes. Successfully parsed files are appended
+to a checkpoint file, so an interrupted run picks up where it left off. Failed
+files, and files whose OCR timed out or failed ("degraded"), are retried on the
+next run.
+
+Each worker runs its own OCR pool and parse sandbox, one process each unless
+OCR_WORKERS / SANDBOX_WORKERS say otherwise, and gets an equal share of the
+GROQ_RPM / GROQ_TPM budget:
+
+    python ingest_resumes.py Data/resumes --output resumes.ndjson
+    python ingest_resumes.py Data/resumes --output resumes.ndjson --extract
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".doc")
+
+
+def find_resumes(input_dir):
+    """All resume files under input_dir, as paths relative to it, in a stable order."""
+    found = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return sorted(found)
+
+
+def load_checkpoint(checkpoint_path):
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def _init_worker(workers):
+    # Set before the worker imports the services; the workers' pools add up across the run
+    os.environ.setdefault("OCR_WORKERS", "1")
+    os.environ.setdefault("SANDBOX_WORKERS", "1")
+    from utils import llm_scheduler
+
+    llm_scheduler.share_budget(workers)
+    # Stop this worker's OCR pool and parse sandbox when it exits; otherwise the exiting
+    # worker waits forever to join OCR processes that sit idle on their queue. The high
+    # priority runs this before multiprocessing closes the pool's queues (priority 10)
+    # and joins the children.
+    multiprocessing.util.Finalize(None, _shutdown_services, exitpriority=100)
+
+
+def _shutdown_services():
+    from utils import ocr_service, parse_sandbox
+
+    ocr_service.shutdown(wait=True)
+    parse_sandbox.shutdown()
+
+
+def ingest_one(input_dir, rel_path, extract):
+    """Runs in a worker process: parse one resume (and optionally run LLM extraction)."""
+    path = os.path.join(input_dir, rel_path)
+    started = time.perf_counter()
+    record = {"file": rel_path}
+    # The agents log with print(); keep stdout clean for the NDJSON stream
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            _ingest(path, extract, record)
+            extraction = record["extraction"]
+            record["status"] = "degraded" if extraction.get("timed_out") or extraction.get("failed") else "ok"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+    record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return record
+
+
+def _ingest(path, extract, record):
+    # Imported in the worker so the heavy model imports happen once per process
+    from models.ResumeAgent import parse_resume, resume_agent
+
+    with open(path, "rb") as f:
+        parsed = parse_resume(f.read(), os.path.basename(path))
+    if not parsed:
+        raise ValueError("No text extracted from resume.")
+    record["extraction"] = parsed.extraction
+    if extract:
+        # Reuses the parse above from the parse cache
+        result = resume_agent.invoke(path)
+        if isinstance(result, str):
+            result = json.loads(result)
+        if "error" in result:
+            raise ValueError(result["error"])
+        record["resume"] = result
+    else:
+        record["text"] = parsed.text
+        record["chars"] = len(parsed.text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse a directory of resumes in parallel.")
+    parser.add_argument("input_dir", nargs="?", default=os.path.join("Data", "resumes"))
+    parser.add_argument("--output", default="-", help="NDJSON output file ('-' for stdout)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--extract", action="store_true",
+                        help="also run structured LLM extraction (resume_agent) per file")
+    args = parser.parse_args(argv)
+
+    checkpoint_path = args.checkpoint or (
+        "ingest.checkpoint" if args.output == "-" else f"{args.output}.checkpoint"
+    )
+    done = load_checkpoint(checkpoint_path)
+    pending = [f for f in find_resumes(args.input_dir) if f not in done]
+    print(f"[INFO] {len(done)} files already ingested, {len(pending)} to go "
+          f"with {args.workers} workers", file=sys.stderr)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+    ok = degraded = failed = 0
+    interrupted = False
+    executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                   initargs=(args.workers,))
+    try:
+        futures = [executor.submit(ingest_one, args.input_dir, f, args.extract) for f in pending]
+        for future in as_completed(futures):
+            record = future.result()
+            # Write the record before checkpointing it: a crash in between re-parses, never drops a file
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if record["status"] == "ok":
+                checkpoint.write(record["file"] + "\n")
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+                ok += 1
+            elif record["status"] == "degraded":
+                degraded += 1
+            else:
+                failed += 1
+    except KeyboardInterrupt:
+        print("[WARN] Interrupted; re-run the same command to resume.", file=sys.stderr)
+        interrupted = True
+    finally:
+        executor.shutdown(wait=not interrupted, cancel_futures=True)
+        checkpoint.close()
+        if out is not sys.stdout:
+            out.close()
+
+    if interrupted:
+        return 130
+    print(f"[INFO] Done: {ok} ok, {degraded} degraded, {failed} failed", file=sys.stderr)
+    return 0 if not (degraded or failed) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
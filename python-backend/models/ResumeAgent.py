@@ -4,130 +4,178 @@ import json
 print("application import json ...")
 from langchain.tools import tool
 print("application import tool from langchain.tools ...")
-from langchain_core.prompts import PromptTemplate
-print("application import PromptTemplate from langchain_core.prompts ...")
-from langchain_core.output_parsers import StrOutputParser
-print("application import StrOutputParser from langchain_core.output_parsers ...")
-from langchain_groq import ChatGroq
-print("application import ChatGroq from langchain_groq ...")
 # from utils import resume_parser
+import time
 
-
-print("application import partition_pdf from unstructured.partition.pdf ...")
-
-def image_resume_parsing(pdf_path):
-    from unstructured.partition.pdf import partition_pdf
-    elements = partition_pdf(
-        filename=pdf_path,
-        extract_images_in_pdf=True,
-        ocr_languages="eng",
-        strategy="hi_res"
-    )
-
-    full_text = "\n".join([str(element) for element in elements])
-
-    full_text = full_text.replace(")", "S")
-
-
-    print(full_text)
-
-    output_dir = "output"
-    os.makedirs(output_dir, exist_ok=True)
-
-    base_filename = os.path.basename(pdf_path)
-    output_filename = os.path.splitext(base_filename)[0] + "_output.txt"
-    output_path = os.path.join(output_dir, output_filename)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(full_text)
-
-    print(f"Text extracted and saved to: {output_path}")
-    return full_text
+from utils.document_analysis import analyze_document
+from utils.extraction_cascade import run_cascade
+from utils.parse_sandbox import run_sandboxed
+from utils.disk_cache import DiskCache, content_key
+from utils.format_extractors import ParsedDocument, detect_format, get_extractor, register_extractor
+from utils.resume_sections import segment_layout, segment_text
+from utils.resume_compaction import compact_resume_text
+from utils.contact_extraction import extract_contact_fields
+from utils import llm_client
+from utils.single_flight import inflight
 
 
+OUTPUT_FOLDER = "segment_output"
 
+# Writing extracted text to segment_output/ and output/ is a debugging aid; off on the request path
+DEBUG_DUMPS = os.getenv("RESUME_DEBUG_DUMPS", "false").lower() in ("1", "true", "yes")
 
-import fitz  # PyMuPDF
-import os
+# Bump these whenever text extraction or the extraction prompt changes so old cache entries stop matching
+EXTRACTOR_VERSION = "7"
+RESUME_PROMPT_VERSION = "4"
 
+# Text from a cascade cut short by its deadline is reused only briefly, then parsing is retried
+DEGRADED_PARSE_TTL = int(os.getenv("DEGRADED_PARSE_TTL", "300"))
 
-OUTPUT_FOLDER = "segment_output"
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+parse_cache = DiskCache(
+    os.getenv("PARSE_CACHE_DIR", os.path.join("cache", "parse")),
+    max_bytes=int(os.getenv("PARSE_CACHE_MAX_MB", "256")) * 1024 * 1024
+)
 
-has_image = False
 
+def dump_debug_text(output_dir, filename, text):
+    if not DEBUG_DUMPS:
+        return
+    os.makedirs(output_dir, exist_ok=True)
+    output_filename = f"{os.path.splitext(os.path.basename(filename))[0]}_output.txt"
+    out_path = os.path.join(output_dir, output_filename)
+    with open(out_path, "w", encoding="utf-8") as out:
+        out.write(text)
+    print(f"Text saved to: {out_path}")
 
 
-def extract_text_from_pdf(path):
+def extract_text_from_pdf(path, analysis=None):
     try:
-        doc = fitz.open(path)
-        text = ""
-        for page in doc:
-            text += page.get_text() + "\n"
-        return text
+        if analysis is None:
+            analysis = analyze_document(path)
+        return analysis.text
     except Exception as e:
         print(f"Failed to read PDF {path}: {e}")
         return None
 
-def contains_image(pdf_path):
+def contains_image(pdf_path, analysis=None):
     try:
-        doc = fitz.open(pdf_path)
-        for page_num in range(len(doc)):
-            images = doc[page_num].get_images(full=True)
-            if images:  # If there's at least one image on the page
-                return True
-        return False
+        if analysis is None:
+            analysis = analyze_document(pdf_path)
+        return analysis.has_images
     except Exception as e:
         print(f"Failed to check images in {pdf_path}: {e}")
         return False
 
-def parse_document(file_path):
-    filename = os.path.basename(file_path)
-
-    if not (filename.endswith(".pdf") or filename.endswith(".docx")):
+@register_extractor("pdf")
+def extract_pdf_text(data, filename):
+    # Open the document once, in a resource-limited child; every step below reuses this analysis
+    started = time.perf_counter()
+    analysis = run_sandboxed(analyze_document, data, filename)
+    text_layer_ms = (time.perf_counter() - started) * 1000
+
+    # Only scanned or image-dominated pages escalate to OCR, each stage within its deadline
+    ocr_pages = analysis.ocr_pages
+    if ocr_pages:
+        print(f"OCR needed for {len(ocr_pages)}/{analysis.page_count} pages of resume: {filename}.")
+    cascade = run_cascade(data, analysis, text_layer_ms)
+    if cascade.timed_out or cascade.failed:
+        print(f"OCR incomplete for {filename} (timed out: {cascade.timed_out}, failed: {cascade.failed}); "
+              f"using best text so far")
+
+    page_texts = {}
+    for number, text in cascade.page_texts.items():
+        # hi_res OCR reads "S" as ")" on our resume templates
+        page_texts[number] = text.replace(")", "S") if cascade.page_stages[number] == "hi_res" else text
+    ocr_text = "\n".join(page_texts[n] for n in ocr_pages if cascade.page_stages[n] != "text_layer")
+    if ocr_text:
+        print(ocr_text)
+        dump_debug_text("output", filename, ocr_text)
+
+    text = "".join(page_texts[page.number] + "\n" for page in analysis.pages)
+    # Font sizes and bold flags only exist for the text layer; OCR'd pages fall back to wording alone
+    sections = segment_text(text) if cascade.stage != "text_layer" else segment_layout(analysis)
+    return ParsedDocument(text, sections, analysis.links, cascade.report())
+
+def parse_resume(data, filename):
+    """Extract resume text and sections straight from an upload buffer; nothing is written to disk.
+
+    Results are cached by content hash and extractor version, so the sections can be reused
+    by any downstream call without reparsing. Concurrent uploads of the same bytes share
+    one parse.
+    """
+    cache_key = content_key(data, "text", EXTRACTOR_VERSION)
+    cached = parse_cache.get(cache_key)
+    if cached is not None:
+        return ParsedDocument(cached["text"], cached["sections"], cached.get("links", []),
+                              cached.get("extraction", {}))
+    return inflight.do(cache_key, _parse_resume, data, filename, cache_key)
+
+def _parse_resume(data, filename, cache_key):
+    fmt = detect_format(data)
+    extractor = get_extractor(fmt)
+    if extractor is None:
         print(f"Unsupported file type: {filename}")
         return None
 
-    # Check for image-based resume
-    if filename.endswith(".pdf") and contains_image(file_path):
-        print(f"Image data found in resume: {filename}. Using image parser.")
-        return image_resume_parsing(file_path)
-
-    # Otherwise proceed with text extraction
-    text = extract_text_from_pdf(file_path)
-
-    if text:
-        output_filename = f"{os.path.splitext(filename)[0]}_output.txt"
-        out_path = os.path.join(OUTPUT_FOLDER, output_filename)
-
-        with open(out_path, "w", encoding="utf-8") as out:
-            out.write(text)
-        print(f"Text saved to: {out_path}")
-        return text
-    else:
+    started = time.perf_counter()
+    try:
+        # DOCX/DOC parsing runs whole in the sandbox; the PDF extractor sandboxes its own text-layer
+        # pass and hands OCR to the OCR worker pool
+        parsed = extractor(data, filename) if fmt == "pdf" else run_sandboxed(extractor, data, filename)
+    except Exception as e:
+        print(f"Failed to read {fmt.upper()} {filename}: {e}")
         return None
 
-llm = ChatGroq(
-    model_name="llama3-70b-8192",
-    api_key=os.getenv("GROQ_API_KEY")
-)
-
-
-@tool
-def resume_agent(resume_file_path: str) -> dict:
-    """Extract structured info from resume file path and return JSON object."""
-
-    if not os.path.isfile(resume_file_path):
-        return {"error": f"File not found: {resume_file_path}"}
+    if parsed is None or not parsed.text.strip():
+        return None
+    if not parsed.extraction:
+        parsed.extraction = {"stage": fmt, "timings_ms": {fmt: round((time.perf_counter() - started) * 1000, 1)}}
 
-    resume_text = parse_document(resume_file_path)
+    dump_debug_text(OUTPUT_FOLDER, filename, parsed.text)
+    degraded = parsed.extraction.get("timed_out") or parsed.extraction.get("failed")
+    parse_cache.put(cache_key, {
+        "text": parsed.text, "sections": parsed.sections, "links": parsed.links,
+        "extraction": parsed.extraction,
+    }, ttl=DEGRADED_PARSE_TTL if degraded else None)
+    return parsed
 
-    if not resume_text:
-        return {"error": "No text extracted from resume."}
-    
-    print(f"Extracted resume text length: {len(resume_text)} characters")
+def parse_document_bytes(data, filename):
+    parsed = parse_resume(data, filename)
+    return parsed.text if parsed else None
 
-    prompt_template = PromptTemplate.from_template("""
+def parse_document(file_path):
+    with open(file_path, "rb") as f:
+        data = f.read()
+    return parse_document_bytes(data, os.path.basename(file_path))
+
+
+# Output schema of the extraction; fields found locally are dropped from the prompt
+RESUME_FIELDS = {
+    "name": '"string"',
+    "contact_no": '"string"',
+    "email": '"string"',
+    "linkedin_profile_link": '"string"',
+    "skills": '["skill1", "skill2"]',
+    "experience": '"string"',
+    "total_experience_years": "float",
+    "projects_built": '["project1", "project2"]',
+    "achievements_like_awards_and_certifications": '["achievement1"]',
+}
+
+# What the offline stub backend returns for extraction prompts
+STUB_RESUME = {
+    "name": "Jane Doe",
+    "contact_no": "+1 555 010 0100",
+    "email": "jane.doe@example.com",
+    "linkedin_profile_link": "https://www.linkedin.com/in/janedoe",
+    "skills": ["Python", "SQL", "Docker"],
+    "experience": "Software Engineer at Example Corp (2020 - 2024)",
+    "total_experience_years": 4.0,
+    "projects_built": ["Resume parser"],
+    "achievements_like_awards_and_certifications": ["AWS Certified Developer"],
+}
+
+llm_client.register_prompt("resume_extraction", """
 You are an expert at extracting structured JSON from resumes.
 
 ONLY RETURN VALID JSON. Do not include any explanation or text outside of JSON.
@@ -135,146 +183,80 @@ ONLY RETURN VALID JSON. Do not include any explanation or text outside of JSON.
 Extract the following details:
 
 {{
-  "name": "string",
-  "contact_no": "string",
-  "email": "string",
-  "linkedin_profile_link": "string",
-  "skills": ["skill1", "skill2"],
-  "experience": "string",
-  "total_experience_years": float,
-  "projects_built": ["project1", "project2"],
-  "achievements_like_awards_and_certifications": ["achievement1"]
+{fields}
 }}
 
 --- START OF RESUME ---
 {resume_text}
 --- END OF RESUME ---
-""")
-
-
-    print(f"Using resume text:\n{resume_text[:500]}...")  # Log first 500 chars for debugging
-    chain = prompt_template | llm | StrOutputParser()
-
-    print(f"Processing resume: {resume_file_path}")
-    result = chain.invoke({"resume_text": resume_text})
-    print(f"Resume processing result: {result}")
-
-    return result
-
-
-import os
-print("application import os ...")
-import json
-print("application import json ...")
-from langchain.tools import tool
-print("application import tool from langchain.tools ...")
-from langchain_core.prompts import PromptTemplate
-print("application import PromptTemplate from langchain_core.prompts ...")
-from langchain_core.output_parsers import StrOutputParser
-print("application import StrOutputParser from langchain_core.output_parsers ...")
-from langchain_groq import ChatGroq
-print("application import ChatGroq from langchain_groq ...")
-# from utils import resume_parser
-
+""", version=RESUME_PROMPT_VERSION, priority=llm_client.BATCH, max_output_tokens=700, json_mode=True,
+   stub_reply=json.dumps(STUB_RESUME))
 
-print("application import partition_pdf from unstructured.partition.pdf ...")
 
-def image_resume_parsing(pdf_path):
-    from unstructured.partition.pdf import partition_pdf
-    elements = partition_pdf(
-        filename=pdf_path,
-        extract_images_in_pdf=True,
-        ocr_languages="eng",
-        strategy="hi_res"
+def prepare_extraction(parsed):
+    """(locally extracted fields, the remaining RESUME_FIELDS for the prompt, compacted resume text)."""
+    # Contact details and experience dates come out of regexes; the LLM only writes what needs reading
+    local_fields = extract_contact_fields(parsed.text, parsed.sections, parsed.links)
+    print(f"Extracted locally: {sorted(local_fields)}")
+    fields = ",\n".join(
+        f'  "{name}": {shape}' for name, shape in RESUME_FIELDS.items() if name not in local_fields
     )
 
-    full_text = "\n".join([str(element) for element in elements])
-
-    full_text = full_text.replace(")", "S")
-
-
-    print(full_text)
+    # Prompt size drives Groq latency and rate-limit usage; send only what the extractor needs
+    prompt_text, compaction = compact_resume_text(parsed.text)
+    print(f"Compacted resume from {compaction['tokens_before']} to {compaction['tokens_after']} tokens"
+          f"{' (truncated to budget)' if compaction['truncated'] else ''}")
+    return local_fields, fields, prompt_text
 
-    output_dir = "output"
-    os.makedirs(output_dir, exist_ok=True)
-
-    base_filename = os.path.basename(pdf_path)
-    output_filename = os.path.splitext(base_filename)[0] + "_output.txt"
-    output_path = os.path.join(output_dir, output_filename)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(full_text)
-
-    print(f"Text extracted and saved to: {output_path}")
-    return full_text
 
+def merge_fields(extracted, local_fields):
+    # Deterministic values win; keep the documented field order for consumers
+    extracted = {**extracted, **local_fields}
+    merged = {name: extracted.get(name) for name in RESUME_FIELDS}
+    merged.update((k, v) for k, v in extracted.items() if k not in merged)
+    return merged
 
 
+def extract_resume(data, filename):
+    """Extract structured info from an uploaded resume's bytes; returns the JSON string from the LLM."""
 
-import fitz  # PyMuPDF
-import os
-
-
-OUTPUT_FOLDER = "segment_output"
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    # Same bytes + same extractor/prompt/backend/model => same result; skip OCR and the LLM entirely
+    cache_key = content_key(data, "resume", EXTRACTOR_VERSION, RESUME_PROMPT_VERSION,
+                            llm_client.completion_source("resume_extraction"))
+    cached = parse_cache.get(cache_key)
+    if cached is not None:
+        print(f"Parse cache hit for {filename}")
+        return cached["resume_json"]
+    # The same resume submitted again while this one is still in flight waits for it
+    return inflight.do(cache_key, _extract_resume, data, filename, cache_key)
 
-has_image = False
 
+def _extract_resume(data, filename, cache_key):
+    parsed = parse_resume(data, filename)
 
+    if not parsed:
+        return {"error": "No text extracted from resume."}
+    resume_text = parsed.text
+    
+    print(f"Extracted resume text length: {len(resume_text)} characters")
+    local_fields, fields, prompt_text = prepare_extraction(parsed)
 
-def extract_text_from_pdf(path):
-    try:
-        doc = fitz.open(path)
-        text = ""
-        for page in doc:
-            text += page.get_text() + "\n"
-        return text
-    except Exception as e:
-        print(f"Failed to read PDF {path}: {e}")
-        return None
-
-def contains_image(pdf_path):
+    print(f"Using resume text:\n{prompt_text[:500]}...")  # Log first 500 chars for debugging
+    print(f"Processing resume: {filename}")
     try:
-        doc = fitz.open(pdf_path)
-        for page_num in range(len(doc)):
-            images = doc[page_num].get_images(full=True)
-            if images:  # If there's at least one image on the page
-                return True
-        return False
-    except Exception as e:
-        print(f"Failed to check images in {pdf_path}: {e}")
-        return False
-
-def parse_document(file_path):
-    filename = os.path.basename(file_path)
-
-    if not (filename.endswith(".pdf") or filename.endswith(".docx")):
-        print(f"Unsupported file type: {filename}")
-        return None
-
-    # Check for image-based resume
-    if filename.endswith(".pdf") and contains_image(file_path):
-        print(f"Image data found in resume: {filename}. Using image parser.")
-        return image_resume_parsing(file_path)
-
-    # Otherwise proceed with text extraction
-    text = extract_text_from_pdf(file_path)
-
-    if text:
-        output_filename = f"{os.path.splitext(filename)[0]}_output.txt"
-        out_path = os.path.join(OUTPUT_FOLDER, output_filename)
-
-        with open(out_path, "w", encoding="utf-8") as out:
-            out.write(text)
-        print(f"Text saved to: {out_path}")
-        return text
-    else:
-        return None
-
-llm = ChatGroq(
-    model_name="llama3-70b-8192",
-    api_key=os.getenv("GROQ_API_KEY")
-)
+        extracted = llm_client.invoke_json("resume_extraction", fields=fields, resume_text=prompt_text)
+    except ValueError as e:
+        return {"error": f"Resume extraction failed: {e}"}
+    print(f"Resume processing result: {extracted}")
+    if not isinstance(extracted, dict):
+        return {"error": "Resume extraction did not return a JSON object."}
+
+    result = json.dumps(merge_fields(extracted, local_fields), ensure_ascii=False)
+
+    # Only cache results the endpoints can actually use, and never ones built on cut-short OCR
+    if not (parsed.extraction.get("timed_out") or parsed.extraction.get("failed")):
+        parse_cache.put(cache_key, {"resume_json": result})
+    return result
 
 
 @tool
@@ -284,45 +266,6 @@ def resume_agent(resume_file_path: str) -> dict:
     if not os.path.isfile(resume_file_path):
         return {"error": f"File not found: {resume_file_path}"}
 
-    resume_text = parse_document(resume_file_path)
-
-    if not resume_text:
-        return {"error": "No text extracted from resume."}
-    
-    print(f"Extracted resume text length: {len(resume_text)} characters")
-
-    prompt_template = PromptTemplate.from_template("""
-You are an expert at extracting structured JSON from resumes.
-
-ONLY RETURN VALID JSON. Do not include any explanation or text outside of JSON.
-
-Extract the following details:
-
-{{
-  "name": "string",
-  "contact_no": "string",
-  "email": "string",
-  "linkedin_profile_link": "string",
-  "skills": ["skill1", "skill2"],
-  "experience": "string",
-  "total_experience_years": float,
-  "projects_built": ["project1", "project2"],
-  "achievements_like_awards_and_certifications": ["achievement1"]
-}}
-
---- START OF RESUME ---
-{resume_text}
---- END OF RESUME ---
-""")
-
-
-    print(f"Using resume text:\n{resume_text[:500]}...")  # Log first 500 chars for debugging
-    chain = prompt_template | llm | StrOutputParser()
-
-    print(f"Processing resume: {resume_file_path}")
-    result = chain.invoke({"resume_text": resume_text})
-    print(f"Resume processing result: {result}")
-
-    return result
-
-
+    with open(resume_file_path, "rb") as f:
+        data = f.read()
+    return extract_resume(data, os.path.basename(resume_file_path))
@@ -2,21 +2,32 @@
 
 import os
 import json
+import asyncio
 from langchain.tools import tool
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
-from .ResumeAgent import resume_agent
-
-
-# Set up LLM
-llm = ChatGroq(
-    model_name="llama3-70b-8192",
-    api_key=os.getenv("GROQ_API_KEY")
-)
+from .ResumeAgent import resume_agent, parse_resume, prepare_extraction, merge_fields, STUB_RESUME
+from utils import llm_client
+from utils.disk_cache import content_key
+from utils.calibration_index import calibration
+from utils.json_repair import parse_json
+from utils.single_flight import inflight
+from utils.resume_compaction import compact_resume_text, count_tokens
+from utils.resume_sections import SCORING_SECTIONS, select_sections
+
+# Cap on raw section text sent to the scoring prompt
+SCORING_TOKEN_BUDGET = int(os.getenv("SCORING_TOKEN_BUDGET", "1500"))
+
+
+# What the offline stub backend returns for scoring prompts
+STUB_EVALUATION = {
+    "scores": {"technical_skills": 24, "experience": 18, "certifications": 9, "projects": 11, "soft_skills": 10},
+    "total_score": 72,
+    "strengths_summary": "Solid Python and SQL background with relevant project work.",
+    "improvement_areas": ["Cloud deployment", "System design", "Testing practices"],
+    "suggestions": ["Build a deployed project", "Study distributed systems", "Add unit tests to projects"],
+}
 
 # Prompt with contextual history (MCP)
-prompt_template = PromptTemplate.from_template("""
+llm_client.register_prompt("resume_scoring", """
 You are a recruitment expert evaluating a candidate's resume for a specific job.
 
 Resume text:
@@ -55,155 +66,17 @@ Respond in this JSON:
   "improvement_areas": [str, str, str],
   "suggestions": [str, str, str]
 }}
-""")
-
-# Load previous resume evaluations from MCP history
-def load_resume_history(history_file="resume_history.json", limit=3):
-    if not os.path.exists(history_file):
-        return ""
-    with open(history_file, "r") as f:
-        history = json.load(f)
-    recent = history[-limit:]  # Last N results
-    return json.dumps(recent, indent=2)
-
-# Save new evaluation result to MCP history
-def save_to_history(new_result, history_file="resume_history.json"):
-    history = []
-    if os.path.exists(history_file):
-        with open(history_file, "r") as f:
-            history = json.load(f)
-    history.append(new_result)
-    with open(history_file, "w") as f:
-        json.dump(history, f, indent=2)
-
-# Function to run MCP evaluation
-def run_mcp_resume_evaluation(resume_text, job_description):
-    prior_context = load_resume_history()
-    
-    chain = prompt_template | llm | StrOutputParser()
-    result = chain.invoke({
-        "resume_text": resume_text,
-        "job_description": job_description,
-        "previous_results": prior_context
-    })
-
-    # Parse and generate feedback
-    try:
-        result_json = json.loads(result)
-
-        # Save result to history
-        save_to_history({
-            "resume": resume_text[:500],  # store truncated resume
-            "job_description": job_description[:500],
-            "result": result_json
-        })
-
-        feedback = f"""
-        === Candidate Feedback ===
-
-        ✅ Match Score: {result_json['total_score']} / 100
-
-        📊 Scores by Criteria:
-        - Technical Skills: {result_json['scores']['technical_skills']}
-        - Experience: {result_json['scores']['experience']}
-        - Certifications: {result_json['scores']['certifications']}
-        - Projects: {result_json['scores']['projects']}
-        - Soft Skills: {result_json['scores']['soft_skills']}
-
-        🌟 Strengths:
-        {result_json['strengths_summary']}
-
-        🔧 Top 3 Areas to Improve:
-        1. {result_json['improvement_areas'][0]}
-        2. {result_json['improvement_areas'][1]}
-        3. {result_json['improvement_areas'][2]}
-
-        📚 Suggestions and Resources:
-        1. {result_json['suggestions'][0]}
-        2. {result_json['suggestions'][1]}
-        3. {result_json['suggestions'][2]}
-        """
-        return feedback.strip()
-
-    except Exception as e:
-        return f"Error parsing response: {e}\nRaw response:\n{result}"
-
-
-
-
-@tool
-def scoring_agent(input_str: str) -> str:
-    """
-    Evaluates a parsed resume against a job description and returns feedback.
-    input_str: JSON string with keys 'resume_json' and 'job_description'
-    """
-    try:
-        data = json.loads(input_str)
-        resume_json = data.get("resume_json", {})
-        job_description = data.get("job_description", "")
-    except json.JSONDecodeError:
-        return "Invalid input JSON. Expected keys: resume_json, job_description"
-
-    # Build a resume string from structured fields
-    resume_text = f"""
-    Name: {resume_json.get('name')}
-    Skills: {', '.join(resume_json.get('skills', []))}
-    Experience: {resume_json.get('experience')}
-    Certifications: {', '.join(resume_json.get('achievements_like_awards_and_certifications', []))}
-    Projects: {', '.join(resume_json.get('projects_built', []))}
-    """
-
-    return run_mcp_resume_evaluation(resume_text, job_description)
-
-
-if __name__ == "__main__":
-    resume_file_path = "data/resumes/Manil Modi Resume 5.pdf"
-    resume_agent_input = json.dumps({"resume_file_path": resume_file_path})
-    parsed_resume = resume_agent.invoke(resume_file_path)
-
-
-    # 🔧 Ensure parsed_resume is a Python dict
-    # if isinstance(parsed_resume, str):
-    #     parsed_resume = json.loads(parsed_resume)
-
-    # Load job description
-    job_description_path = "data/job_descriptions/extracted_text (3).txt"
-    with open(job_description_path, "r", encoding="utf-8") as f:
-        job_description_text = f.read()
-
-    test_input = {
-        "resume_json": parsed_resume,
-        "job_description": job_description_text
-    }
-
-    input_str = json.dumps(test_input)
-    output = scoring_agent.invoke(input_str)
-    print(output)
-
-# scoring_agent.py
-
-import os
-import json
-from langchain.tools import tool
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
-from .ResumeAgent import resume_agent
+""", version="2", priority=llm_client.BATCH, max_output_tokens=400, json_mode=True, timeout=45,
+   stub_reply=json.dumps(STUB_EVALUATION))
 
-os.environ["GROQ_API_KEY"] = "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"
-
-# Set up LLM
-llm = ChatGroq(
-    model_name="llama3-70b-8192",
-    api_key=os.environ["GROQ_API_KEY"]
-)
-
-# Prompt with contextual history (MCP)
-prompt_template = PromptTemplate.from_template("""
-You are a recruitment expert evaluating a candidate's resume for a specific job.
+# Extraction and scoring in one call, for the hiring workflow's fused mode
+llm_client.register_prompt("resume_extract_and_score", """
+You are a recruitment expert. Extract the candidate's details from the resume and evaluate
+the resume for the job in one step.
 
-Resume text:
+--- START OF RESUME ---
 {resume_text}
+--- END OF RESUME ---
 
 Job description:
 {job_description}
@@ -211,7 +84,7 @@ Job description:
 Here are 1–3 past candidate evaluations for similar roles (Model Context Protocol):
 {previous_results}
 
-Evaluate the current resume based on the following criteria:
+Evaluate the resume based on the following criteria:
 - Technical Skills (30%)
 - Experience (25%)
 - Certifications (15%)
@@ -224,8 +97,11 @@ Evaluate the current resume based on the following criteria:
 - Don't assume anything that's not clearly in the resume.
 - Compare against past resumes if helpful for calibration.
 
-Respond in this JSON:
+ONLY RETURN VALID JSON, in this shape (all scores are integers, total_score from 0 to 100):
 {{
+  "resume": {{
+{fields}
+  }},
   "scores": {{
     "technical_skills": int,
     "experience": int,
@@ -238,41 +114,45 @@ Respond in this JSON:
   "improvement_areas": [str, str, str],
   "suggestions": [str, str, str]
 }}
-""")
-
-# Load previous resume evaluations from MCP history
-def load_resume_history(history_file="resume_history.json", limit=3):
-    if not os.path.exists(history_file):
-        return ""
-    with open(history_file, "r") as f:
-        history = json.load(f)
-    recent = history[-limit:]  # Last N results
-    return json.dumps(recent, indent=2)
-
-# Save new evaluation result to MCP history
-def save_to_history(new_result, history_file="resume_history.json"):
-    history = []
-    if os.path.exists(history_file):
-        with open(history_file, "r") as f:
-            history = json.load(f)
-    history.append(new_result)
-    with open(history_file, "w") as f:
-        json.dump(history, f, indent=2)
+""", version="1", priority=llm_client.BATCH, max_output_tokens=1000, json_mode=True, timeout=60,
+   stub_reply=json.dumps({"resume": STUB_RESUME, **STUB_EVALUATION}))
+
+# Load the past evaluations most similar to this job from MCP history
+def load_resume_history(job_description, limit=3):
+    return calibration.context(job_description, limit)
+
+# Save new evaluation result to MCP history (and index it for calibration lookups)
+def save_to_history(new_result):
+    # Canned stub/replay evaluations would become calibration context for real scoring
+    if llm_client.REAL_COMPLETIONS:
+        calibration.add(new_result)
 
 # Function to run MCP evaluation
 def run_mcp_resume_evaluation(resume_text, job_description):
-    prior_context = load_resume_history()
-    
-    chain = prompt_template | llm | StrOutputParser()
-    result = chain.invoke({
-        "resume_text": resume_text,
-        "job_description": job_description,
-        "previous_results": prior_context
-    })
+    result = score_resume(resume_text, job_description)
+    return result.get("evaluation") or result["error"]
+
+
+def score_resume(resume_text, job_description):
+    """Evaluate resume text; returns {"evaluation", "total_score", "scores"} or {"error"}."""
+    # Identical concurrent scoring requests (several tabs, client retries) share one evaluation
+    key = content_key(f"{resume_text}\0{job_description}".encode("utf-8"), "score")
+    return inflight.do(key, _evaluate, resume_text, job_description)
+
 
+def _evaluate(resume_text, job_description):
+    prior_context = load_resume_history(job_description)
+    
     # Parse and generate feedback
     try:
-        result_json = json.loads(result)
+        result_json = llm_client.invoke_json(
+            "resume_scoring",
+            resume_text=resume_text,
+            job_description=job_description,
+            previous_results=prior_context
+        )
+        total_score = score_value(result_json)
+        feedback = format_feedback(result_json)
 
         # Save result to history
         save_to_history({
@@ -280,189 +160,98 @@ def run_mcp_resume_evaluation(resume_text, job_description):
             "job_description": job_description[:500],
             "result": result_json
         })
+        return {"evaluation": feedback, "total_score": total_score, "scores": result_json}
 
-        feedback = f"""
-        === Candidate Feedback ===
+    except Exception as e:
+        return {"error": f"Error parsing response: {e}"}
 
-        ✅ Match Score: {result_json['total_score']} / 100
 
-        📊 Scores by Criteria:
-        - Technical Skills: {result_json['scores']['technical_skills']}
-        - Experience: {result_json['scores']['experience']}
-        - Certifications: {result_json['scores']['certifications']}
-        - Projects: {result_json['scores']['projects']}
-        - Soft Skills: {result_json['scores']['soft_skills']}
+async def ascore_resume(resume_text, job_description):
+    """Async score_resume; the LLM call does not hold a thread while it waits."""
+    key = content_key(f"{resume_text}\0{job_description}".encode("utf-8"), "score")
+    return await inflight.ado(key, _aevaluate, resume_text, job_description)
 
-        🌟 Strengths:
-        {result_json['strengths_summary']}
 
-        🔧 Top 3 Areas to Improve:
-        1. {result_json['improvement_areas'][0]}
-        2. {result_json['improvement_areas'][1]}
-        3. {result_json['improvement_areas'][2]}
+async def _aevaluate(resume_text, job_description):
+    # Embedding the job description and the history lookup are blocking work
+    prior_context = await asyncio.to_thread(load_resume_history, job_description)
 
-        📚 Suggestions and Resources:
-        1. {result_json['suggestions'][0]}
-        2. {result_json['suggestions'][1]}
-        3. {result_json['suggestions'][2]}
-        """
-        return feedback.strip()
+    try:
+        result_json = await llm_client.ainvoke_json(
+            "resume_scoring",
+            resume_text=resume_text,
+            job_description=job_description,
+            previous_results=prior_context
+        )
+        total_score = score_value(result_json)
+        feedback = format_feedback(result_json)
+
+        await asyncio.to_thread(save_to_history, {
+            "resume": resume_text[:500],
+            "job_description": job_description[:500],
+            "result": result_json
+        })
+        return {"evaluation": feedback, "total_score": total_score, "scores": result_json}
 
     except Exception as e:
-        return f"Error parsing response: {e}\nRaw response:\n{result}"
-
-
+        return {"error": f"Error parsing response: {e}"}
 
 
-@tool
-def scoring_agent(input_str: str) -> str:
-    """
-    Evaluates a parsed resume against a job description and returns feedback.
-    input_str: JSON string with keys 'resume_json' and 'job_description'
-    """
-    try:
-        data = json.loads(input_str)
-        resume_json = data.get("resume_json", {})
-        job_description = data.get("job_description", "")
-    except json.JSONDecodeError:
-        return "Invalid input JSON. Expected keys: resume_json, job_description"
+def extract_and_score(data, filename, job_description):
+    """Parse an uploaded resume and extract and score it in a single LLM call.
 
-    # Build a resume string from structured fields
-    resume_text = f"""
-    Name: {resume_json.get('name')}
-    Skills: {', '.join(resume_json.get('skills', []))}
-    Experience: {resume_json.get('experience')}
-    Certifications: {', '.join(resume_json.get('achievements_like_awards_and_certifications', []))}
-    Projects: {', '.join(resume_json.get('projects_built', []))}
+    Returns {"resume", "evaluation", "total_score", "scores"} or {"error"}.
     """
+    key = content_key(data + b"\0" + job_description.encode("utf-8"), "extract_score")
+    return inflight.do(key, _extract_and_score, data, filename, job_description)
 
-    return run_mcp_resume_evaluation(resume_text, job_description)
-
-
-if __name__ == "__main__":
-    resume_file_path = "data/resumes/Manil Modi Resume 5.pdf"
-    resume_agent_input = json.dumps({"resume_file_path": resume_file_path})
-    parsed_resume = resume_agent.invoke(resume_file_path)
-
-
-    # 🔧 Ensure parsed_resume is a Python dict
-    # if isinstance(parsed_resume, str):
-    #     parsed_resume = json.loads(parsed_resume)
 
-    # Load job description
-    job_description_path = "data/job_descriptions/extracted_text (3).txt"
-    with open(job_description_path, "r", encoding="utf-8") as f:
-        job_description_text = f.read()
+def _extract_and_score(data, filename, job_description):
+    parsed = parse_resume(data, filename)
+    if not parsed:
+        return {"error": "No text extracted from resume."}
+    local_fields, fields, prompt_text = prepare_extraction(parsed)
 
-    test_input = {
-        "resume_json": parsed_resume,
-        "job_description": job_description_text
+    try:
+        result_json = llm_client.invoke_json(
+            "resume_extract_and_score",
+            fields=fields,
+            resume_text=prompt_text,
+            job_description=job_description,
+            previous_results=load_resume_history(job_description)
+        )
+        if not isinstance(result_json.get("resume"), dict):
+            raise ValueError("no resume object in response")
+        total_score = score_value(result_json)
+        feedback = format_feedback(result_json)
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+        return {"error": f"Error parsing response: {e}"}
+
+    scores = {k: v for k, v in result_json.items() if k != "resume"}
+    save_to_history({
+        "resume": prompt_text[:500],
+        "job_description": job_description[:500],
+        "result": scores
+    })
+    return {
+        "resume": merge_fields(result_json["resume"], local_fields),
+        "evaluation": feedback,
+        "total_score": total_score,
+        "scores": scores
     }
 
-    input_str = json.dumps(test_input)
-    output = scoring_agent.invoke(input_str)
-    print(output)
-# scoring_agent.py
-
-import os
-import json
-from langchain.tools import tool
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
-from .ResumeAgent import resume_agent
-
-
-# Set up LLM
-llm = ChatGroq(
-    model_name="llama3-70b-8192",
-    api_key=os.getenv("GROQ_API_KEY")
-)
 
-# Prompt with contextual history (MCP)
-prompt_template = PromptTemplate.from_template("""
-You are a recruitment expert evaluating a candidate's resume for a specific job.
+def score_value(result_json):
+    """total_score as an int in 0..100; raises ValueError otherwise."""
+    score = float(result_json["total_score"])
+    if not 0 <= score <= 100:
+        raise ValueError(f"total_score out of range: {score}")
+    return int(round(score))
 
-Resume text:
-{resume_text}
 
-Job description:
-{job_description}
-
-Here are 1–3 past candidate evaluations for similar roles (Model Context Protocol):
-{previous_results}
-
-Evaluate the current resume based on the following criteria:
-- Technical Skills (30%)
-- Experience (25%)
-- Certifications (15%)
-- Projects (15%)
-- Soft Skills (15%)
-
-🔻 **Scoring Guidelines**:
-- Deduct points for any skill, experience, or certification missing.
-- Only award high scores for direct, strong matches.
-- Don't assume anything that's not clearly in the resume.
-- Compare against past resumes if helpful for calibration.
-
-Respond in this JSON:
-{{
-  "scores": {{
-    "technical_skills": int,
-    "experience": int,
-    "certifications": int,
-    "projects": int,
-    "soft_skills": int
-  }},
-  "total_score": int,
-  "strengths_summary": str,
-  "improvement_areas": [str, str, str],
-  "suggestions": [str, str, str]
-}}
-""")
-
-# Load previous resume evaluations from MCP history
-def load_resume_history(history_file="resume_history.json", limit=3):
-    if not os.path.exists(history_file):
-        return ""
-    with open(history_file, "r") as f:
-        history = json.load(f)
-    recent = history[-limit:]  # Last N results
-    return json.dumps(recent, indent=2)
-
-# Save new evaluation result to MCP history
-def save_to_history(new_result, history_file="resume_history.json"):
-    history = []
-    if os.path.exists(history_file):
-        with open(history_file, "r") as f:
-            history = json.load(f)
-    history.append(new_result)
-    with open(history_file, "w") as f:
-        json.dump(history, f, indent=2)
-
-# Function to run MCP evaluation
-def run_mcp_resume_evaluation(resume_text, job_description):
-    prior_context = load_resume_history()
-    
-    chain = prompt_template | llm | StrOutputParser()
-    result = chain.invoke({
-        "resume_text": resume_text,
-        "job_description": job_description,
-        "previous_results": prior_context
-    })
-
-    # Parse and generate feedback
-    try:
-        result_json = json.loads(result)
-
-        # Save result to history
-        save_to_history({
-            "resume": resume_text[:500],  # store truncated resume
-            "job_description": job_description[:500],
-            "result": result_json
-        })
-
-        feedback = f"""
+def format_feedback(result_json):
+    """Render a scoring result; raises KeyError/IndexError/TypeError if a field is missing."""
+    feedback = f"""
         === Candidate Feedback ===
 
         ✅ Match Score: {result_json['total_score']} / 100
@@ -487,29 +276,83 @@ def run_mcp_resume_evaluation(resume_text, job_description):
         2. {result_json['suggestions'][1]}
         3. {result_json['suggestions'][2]}
         """
-        return feedback.strip()
-
-    except Exception as e:
-        return f"Error parsing response: {e}\nRaw response:\n{result}"
-
-
-
+    return feedback.strip()
+
+
+async def astream_evaluation(resume_text, job_description):
+    """Yield ("token", text) events while the evaluation streams, then one ("result", dict) event
+    holding the validated scores and feedback, or ("error", message)."""
+    # Embedding the job description and the history lookup are blocking work
+    prior_context = await asyncio.to_thread(load_resume_history, job_description)
+    chunks = []
+    async for chunk in llm_client.astream(
+        "resume_scoring",
+        resume_text=resume_text,
+        job_description=job_description,
+        previous_results=prior_context
+    ):
+        chunks.append(chunk)
+        yield "token", chunk
 
-@tool
-def scoring_agent(input_str: str) -> str:
-    """
-    Evaluates a parsed resume against a job description and returns feedback.
-    input_str: JSON string with keys 'resume_json' and 'job_description'
-    """
     try:
-        data = json.loads(input_str)
-        resume_json = data.get("resume_json", {})
-        job_description = data.get("job_description", "")
-    except json.JSONDecodeError:
-        return "Invalid input JSON. Expected keys: resume_json, job_description"
+        result_json = parse_json("".join(chunks))
+        total_score = score_value(result_json)
+        feedback = format_feedback(result_json)
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        yield "error", f"Error parsing response: {e}"
+        return
+
+    await asyncio.to_thread(save_to_history, {
+        "resume": resume_text[:500],
+        "job_description": job_description[:500],
+        "result": result_json
+    })
+    yield "result", {"evaluation": feedback, "total_score": total_score, "scores": result_json}
+
+
+def _json_section(resume_json, name):
+    """A scoring section rendered from the extracted resume fields; "" if the field is empty."""
+    value = resume_json.get({
+        "skills": "skills",
+        "experience": "experience",
+        "projects": "projects_built",
+        "certifications": "achievements_like_awards_and_certifications",
+    }[name])
+    if isinstance(value, list):
+        return "\n".join(v if isinstance(v, str) else json.dumps(v) for v in value if v)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value or "")
+
+
+def _share_budget(sections, budget):
+    """Compact each section to a fair share of budget, so one oversized section cannot crowd out the rest."""
+    sections = {name: compact_resume_text(text, budget)[0] for name, text in sections.items()}
+    # What compact_resume_text charges: each kept line plus its newline
+    sizes = {name: sum(count_tokens(line) + 1 for line in text.splitlines()) for name, text in sections.items()}
+    shares = {}
+    remaining = budget
+    # Smallest first: sections under their share keep all of it and leave the rest for the larger ones
+    for i, name in enumerate(sorted(sizes, key=sizes.get)):
+        shares[name] = min(sizes[name], remaining // (len(sizes) - i))
+        remaining -= shares[name]
+    return {name: compact_resume_text(text, shares[name])[0] for name, text in sections.items()}
+
+
+def scoring_resume_text(data):
+    """The resume text to score from a scoring_agent input dict."""
+    resume_json = data.get("resume_json", {})
+
+    # Prefer the resume's own skills/experience/projects/certifications sections when the caller has them
+    resume_sections = data.get("resume_sections") or {}
+    if select_sections(resume_sections, SCORING_SECTIONS):
+        # A heading the segmenter did not recognise leaves its section missing; fill it from the extracted fields
+        sections = {name: resume_sections.get(name) or _json_section(resume_json, name) for name in SCORING_SECTIONS}
+        sections = _share_budget({name: text for name, text in sections.items() if text}, SCORING_TOKEN_BUDGET)
+        return f"Name: {resume_json.get('name')}\n\n{select_sections(sections, SCORING_SECTIONS)}"
 
     # Build a resume string from structured fields
-    resume_text = f"""
+    return f"""
     Name: {resume_json.get('name')}
     Skills: {', '.join(resume_json.get('skills', []))}
     Experience: {resume_json.get('experience')}
@@ -517,189 +360,21 @@ def scoring_agent(input_str: str) -> str:
     Projects: {', '.join(resume_json.get('projects_built', []))}
     """
 
-    return run_mcp_resume_evaluation(resume_text, job_description)
-
-
-if __name__ == "__main__":
-    resume_file_path = "data/resumes/Manil Modi Resume 5.pdf"
-    resume_agent_input = json.dumps({"resume_file_path": resume_file_path})
-    parsed_resume = resume_agent.invoke(resume_file_path)
-
-
-    # 🔧 Ensure parsed_resume is a Python dict
-    # if isinstance(parsed_resume, str):
-    #     parsed_resume = json.loads(parsed_resume)
-
-    # Load job description
-    job_description_path = "data/job_descriptions/extracted_text (3).txt"
-    with open(job_description_path, "r", encoding="utf-8") as f:
-        job_description_text = f.read()
-
-    test_input = {
-        "resume_json": parsed_resume,
-        "job_description": job_description_text
-    }
-
-    input_str = json.dumps(test_input)
-    output = scoring_agent.invoke(input_str)
-    print(output)
-
-# scoring_agent.py
-
-import os
-import json
-from langchain.tools import tool
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
-from .ResumeAgent import resume_agent
-
-os.environ["GROQ_API_KEY"] = "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"
-
-# Set up LLM
-llm = ChatGroq(
-    model_name="llama3-70b-8192",
-    api_key=os.environ["GROQ_API_KEY"]
-)
-
-# Prompt with contextual history (MCP)
-prompt_template = PromptTemplate.from_template("""
-You are a recruitment expert evaluating a candidate's resume for a specific job.
-
-Resume text:
-{resume_text}
-
-Job description:
-{job_description}
-
-Here are 1–3 past candidate evaluations for similar roles (Model Context Protocol):
-{previous_results}
-
-Evaluate the current resume based on the following criteria:
-- Technical Skills (30%)
-- Experience (25%)
-- Certifications (15%)
-- Projects (15%)
-- Soft Skills (15%)
-
-🔻 **Scoring Guidelines**:
-- Deduct points for any skill, experience, or certification missing.
-- Only award high scores for direct, strong matches.
-- Don't assume anything that's not clearly in the resume.
-- Compare against past resumes if helpful for calibration.
-
-Respond in this JSON:
-{{
-  "scores": {{
-    "technical_skills": int,
-    "experience": int,
-    "certifications": int,
-    "projects": int,
-    "soft_skills": int
-  }},
-  "total_score": int,
-  "strengths_summary": str,
-  "improvement_areas": [str, str, str],
-  "suggestions": [str, str, str]
-}}
-""")
-
-# Load previous resume evaluations from MCP history
-def load_resume_history(history_file="resume_history.json", limit=3):
-    if not os.path.exists(history_file):
-        return ""
-    with open(history_file, "r") as f:
-        history = json.load(f)
-    recent = history[-limit:]  # Last N results
-    return json.dumps(recent, indent=2)
-
-# Save new evaluation result to MCP history
-def save_to_history(new_result, history_file="resume_history.json"):
-    history = []
-    if os.path.exists(history_file):
-        with open(history_file, "r") as f:
-            history = json.load(f)
-    history.append(new_result)
-    with open(history_file, "w") as f:
-        json.dump(history, f, indent=2)
-
-# Function to run MCP evaluation
-def run_mcp_resume_evaluation(resume_text, job_description):
-    prior_context = load_resume_history()
-    
-    chain = prompt_template | llm | StrOutputParser()
-    result = chain.invoke({
-        "resume_text": resume_text,
-        "job_description": job_description,
-        "previous_results": prior_context
-    })
-
-    # Parse and generate feedback
-    try:
-        result_json = json.loads(result)
-
-        # Save result to history
-        save_to_history({
-            "resume": resume_text[:500],  # store truncated resume
-            "job_description": job_description[:500],
-            "result": result_json
-        })
-
-        feedback = f"""
-        === Candidate Feedback ===
-
-        ✅ Match Score: {result_json['total_score']} / 100
-
-        📊 Scores by Criteria:
-        - Technical Skills: {result_json['scores']['technical_skills']}
-        - Experience: {result_json['scores']['experience']}
-        - Certifications: {result_json['scores']['certifications']}
-        - Projects: {result_json['scores']['projects']}
-        - Soft Skills: {result_json['scores']['soft_skills']}
-
-        🌟 Strengths:
-        {result_json['strengths_summary']}
-
-        🔧 Top 3 Areas to Improve:
-        1. {result_json['improvement_areas'][0]}
-        2. {result_json['improvement_areas'][1]}
-        3. {result_json['improvement_areas'][2]}
-
-        📚 Suggestions and Resources:
-        1. {result_json['suggestions'][0]}
-        2. {result_json['suggestions'][1]}
-        3. {result_json['suggestions'][2]}
-        """
-        return feedback.strip()
-
-    except Exception as e:
-        return f"Error parsing response: {e}\nRaw response:\n{result}"
-
-
-
 
 @tool
 def scoring_agent(input_str: str) -> str:
     """
     Evaluates a parsed resume against a job description and returns feedback.
-    input_str: JSON string with keys 'resume_json' and 'job_description'
+    input_str: JSON string with keys 'resume_json' and 'job_description',
+    and optionally 'resume_sections' (section name -> text) from the resume parser
     """
     try:
         data = json.loads(input_str)
-        resume_json = data.get("resume_json", {})
         job_description = data.get("job_description", "")
     except json.JSONDecodeError:
         return "Invalid input JSON. Expected keys: resume_json, job_description"
 
-    # Build a resume string from structured fields
-    resume_text = f"""
-    Name: {resume_json.get('name')}
-    Skills: {', '.join(resume_json.get('skills', []))}
-    Experience: {resume_json.get('experience')}
-    Certifications: {', '.join(resume_json.get('achievements_like_awards_and_certifications', []))}
-    Projects: {', '.join(resume_json.get('projects_built', []))}
-    """
-
+    resume_text = scoring_resume_text(data)
     return run_mcp_resume_evaluation(resume_text, job_description)
 
 
@@ -10,14 +10,7 @@ import string
 import datetime
 import json
 import whisper
-from langchain import PromptTemplate
-from langchain_groq import ChatGroq
-from langchain.schema import HumanMessage
-import ast
-
-# === CONFIG ===
-os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")
-llm = ChatGroq(model_name="llama3-70b-8192", api_key=os.environ["GROQ_API_KEY"])
+from utils import llm_client
 
 # Load Whisper model ONCE (avoid reloading inside loops)
 print("[INFO] Loading Whisper model...")
@@ -31,7 +24,7 @@ answer_output_dir = "answers"
 os.makedirs(answer_output_dir, exist_ok=True)
 
 # === Prompt template to generate interview questions ===
-question_prompt_template = PromptTemplate.from_template("""
+llm_client.register_prompt("interview_questions", """
 You have to ask technical questions only.
 
 Given the following job description, generate exactly {n} unique, distinct, and non-repetitive mock interview questions.
@@ -40,57 +33,64 @@ Focus on relevant skills, experience, and responsibilities mentioned in the job
 All the questions must be unique and non-repetitive.
 The questions must be technical.
 
-Format your output strictly as a Python list of strings, like this:
+Format your output strictly as a JSON object with a list of strings, like this:
 
-[
+{{"questions": [
     "Can you describe your experience with managing cloud infrastructure?",
     "How do you approach debugging complex software issues?",
     ...
-]
+]}}
 
 Job Description:
 \"\"\"{job_desc}\"\"\"
-""")
+""", version="2", max_output_tokens=300, json_mode=True, timeout=20,
+   stub_reply=json.dumps({"questions": [
+       "How would you design a REST API for a job application tracker?",
+       "Explain how you would find and fix a memory leak in a Python service."
+   ]}))
+
+llm_client.register_prompt("answer_feedback", """
+You are an expert technical interviewer.
+
+Question:
+{question}
+
+Candidate's answer:
+{answer}
+
+Please provide a concise, constructive evaluation of this answer focusing on accuracy, completeness, and relevance.
+""", version="1", max_output_tokens=300, timeout=20)
 
 def generate_questions_groq(job_desc, n=2):
     print("[INFO] Generating questions using Groq LLaMA...")
-    prompt = question_prompt_template.format(job_desc=job_desc, n=n)
-    response = llm.invoke([HumanMessage(content=prompt)])
-    generated_text = response.content.strip()
-
     try:
-        start_idx = generated_text.find('[')
-        if start_idx == -1:
-            raise ValueError("No list found in output")
-
-        list_text = generated_text[start_idx:]
-        questions = ast.literal_eval(list_text)
-
-        if isinstance(questions, list):
-            unique_questions = []
-            for q in questions:
-                if q not in unique_questions:
-                    unique_questions.append(q)
-            if len(unique_questions) < n:
-                print("[WARN] Less unique questions generated than requested.")
-            return unique_questions[:n]
-        else:
-            print("[ERROR] Parsed output is not a list.")
-            return ["Tell me about yourself."] * n
+        result = llm_client.invoke_json("interview_questions", job_desc=job_desc, n=n)
+    except ValueError as e:
+        print("[ERROR] Parsing Groq LLaMA output failed:", e)
+        result = []
+    return parse_questions(result, n)
 
-    except Exception as e:
+async def agenerate_questions_groq(job_desc, n=2):
+    print("[INFO] Generating questions using Groq LLaMA...")
+    try:
+        result = await llm_client.ainvoke_json("interview_questions", job_desc=job_desc, n=n)
+    except ValueError as e:
         print("[ERROR] Parsing Groq LLaMA output failed:", e)
-        print("[DEBUG] Raw output:", generated_text)
-
-        fallback_questions = []
-        lines = generated_text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line and not line.startswith('Here are') and not line.startswith('['):
-                fallback_questions.append(line)
-        if not fallback_questions:
-            fallback_questions = ["Tell me about yourself."]
-        return fallback_questions[:n]
+        result = []
+    return parse_questions(result, n)
+
+def parse_questions(result, n):
+    questions = result.get("questions", []) if isinstance(result, dict) else result
+    unique_questions = []
+    for q in questions if isinstance(questions, list) else []:
+        if isinstance(q, str) and q.strip() and q not in unique_questions:
+            unique_questions.append(q)
+    if not unique_questions:
+        print("[ERROR] No questions in Groq LLaMA output.")
+        return ["Tell me about yourself."] * n
+    if len(unique_questions) < n:
+        print("[WARN] Less unique questions generated than requested.")
+    return unique_questions[:n]
 
 # === TEXT TO SPEECH ===
 def speak(text):
@@ -165,20 +165,15 @@ def transcribe_audio_whisper(audio_path):
 
 # === Generate validation prompt and get feedback from Groq LLaMA ===
 def validate_answer_with_llm(question, answer):
-    prompt = f"""
-You are an expert technical interviewer.
+    return llm_client.invoke("answer_feedback", question=question, answer=answer).strip()
 
-Question:
-{question}
-
-Candidate's answer:
-{answer}
+async def avalidate_answer_with_llm(question, answer):
+    return (await llm_client.ainvoke("answer_feedback", question=question, answer=answer)).strip()
 
-Please provide a concise, constructive evaluation of this answer focusing on accuracy, completeness, and relevance.
-"""
-    response = llm.invoke([HumanMessage(content=prompt)])
-    feedback = response.content.strip()
-    return feedback
+async def astream_answer_feedback(question, answer):
+    """Yield the feedback text chunk by chunk as Groq produces it."""
+    async for chunk in llm_client.astream("answer_feedback", question=question, answer=answer):
+        yield chunk
 
 # === MOCK ANALYSIS FUNCTIONS ===
 def analyze_video(video_path):
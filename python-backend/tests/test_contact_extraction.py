@@ -0,0 +1,20 @@
+import datetime
+
+from utils.contact_extraction import experience_intervals, total_experience_years
+
+TODAY = datetime.date(2025, 6, 1)
+
+
+def test_hyphenated_month_year_dates():
+    text = "Software Engineer\nAUG-2022 - DEC-2022\nBuilt internal tools"
+    assert experience_intervals(text, TODAY) == [(2022 * 12 + 8, 2022 * 12 + 12)]
+    assert total_experience_years(text, TODAY) == 0.4
+
+
+def test_month_spans_count_both_end_months():
+    assert total_experience_years("Developer\nJan 2022 – Dec 2022", TODAY) == 1.0
+
+
+def test_overlapping_roles_count_once():
+    text = "Engineer\nJan 2021 – Jun 2022\nConsultant\nMar 2022 – Dec 2022"
+    assert total_experience_years(text, TODAY) == 2.0
@@ -0,0 +1,118 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from utils import extraction_cascade, ocr_service
+from utils.document_analysis import DocumentAnalysis, PageAnalysis
+from utils.extraction_cascade import run_cascade
+
+FULL_PAGE = "Experienced backend engineer. " * 10
+
+
+def _analysis(*texts):
+    pages = [PageAnalysis(number, text, len(text), 0, 0.0) for number, text in enumerate(texts)]
+    return DocumentAnalysis("resume.pdf", pages)
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class FakeOCR:
+    """Stands in for ocr_service.submit: answers each engine from a table, recording the calls."""
+
+    def __init__(self, **answers):
+        self.answers = answers
+        self.calls = []
+        self.futures = []
+
+    def submit(self, kind, data, pages, queue_timeout):
+        self.calls.append((kind, pages))
+        answer = self.answers[kind]
+        if isinstance(answer, Exception):
+            raise answer
+        future = answer(pages) if callable(answer) else _done(answer)
+        self.futures.append(future)
+        return future
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    def install(**answers):
+        fake = FakeOCR(**answers)
+        monkeypatch.setattr(ocr_service, "submit", fake.submit)
+        return fake
+    return install
+
+
+def test_text_layer_pages_never_reach_ocr(fake_ocr):
+    fake = fake_ocr()
+    result = run_cascade(b"pdf", _analysis(FULL_PAGE, FULL_PAGE), text_layer_ms=12.34)
+    assert fake.calls == []
+    assert result.stage == "text_layer"
+    assert result.report() == {"stage": "text_layer", "timings_ms": {"text_layer": 12.3},
+                               "timed_out": [], "failed": []}
+
+
+def test_fast_ocr_resolves_scanned_pages_without_hi_res(fake_ocr):
+    fake = fake_ocr(fast={1: FULL_PAGE})
+    result = run_cascade(b"pdf", _analysis(FULL_PAGE, ""))
+    assert fake.calls == [("fast", [1])]
+    assert result.page_texts[1] == FULL_PAGE
+    assert result.page_stages == {0: "text_layer", 1: "fast_ocr"}
+    assert result.stage == "fast_ocr"
+
+
+def test_stage_timeout_escalates_and_cancels(fake_ocr, monkeypatch):
+    monkeypatch.setattr(extraction_cascade, "FAST_OCR_DEADLINE", 0.1)
+    fake = fake_ocr(fast=lambda pages: Future(), hi_res={0: FULL_PAGE})
+    started = time.monotonic()
+    result = run_cascade(b"pdf", _analysis("Scanned"))
+    assert time.monotonic() - started < 1
+    assert fake.futures[0].cancelled()
+    assert fake.calls == [("fast", [0]), ("hi_res", [0])]
+    assert result.timed_out == ["fast_ocr"]
+    assert result.page_stages[0] == "hi_res"
+
+
+def test_exhausted_budget_returns_best_text_so_far(fake_ocr):
+    fake = fake_ocr(fast=lambda pages: Future(), hi_res={0: FULL_PAGE})
+    started = time.monotonic()
+    result = run_cascade(b"pdf", _analysis("Scanned"), budget=0.2)
+    assert time.monotonic() - started < 1
+    # hi_res never started: the fast stage used up the whole budget
+    assert fake.calls == [("fast", [0])]
+    assert result.timed_out == ["fast_ocr"]
+    assert result.page_texts[0] == "Scanned"
+    assert result.stage == "text_layer"
+
+
+def test_busy_queue_counts_as_timeout(fake_ocr):
+    fake_ocr(fast=ocr_service.OCRBusyError("full"), hi_res={0: FULL_PAGE})
+    result = run_cascade(b"pdf", _analysis(""))
+    assert result.timed_out == ["fast_ocr"]
+    assert result.page_texts[0] == FULL_PAGE
+
+
+def test_failed_stage_keeps_longer_earlier_text(fake_ocr):
+    def broken(pages):
+        future = Future()
+        future.set_exception(RuntimeError("paddle crashed"))
+        return future
+
+    fake_ocr(fast={0: "Sca"}, hi_res=broken)
+    result = run_cascade(b"pdf", _analysis("Scanned page"))
+    assert result.failed == ["hi_res"]
+    # Neither OCR stage read more than the text layer already had
+    assert result.page_texts[0] == "Scanned page"
+    assert result.page_stages[0] == "text_layer"
+
+
+def test_hi_res_retries_only_unresolved_pages(fake_ocr):
+    fake = fake_ocr(fast={0: FULL_PAGE, 1: ""}, hi_res={1: FULL_PAGE})
+    result = run_cascade(b"pdf", _analysis("", ""))
+    assert fake.calls == [("fast", [0, 1]), ("hi_res", [1])]
+    assert result.page_stages == {0: "fast_ocr", 1: "hi_res"}
@@ -0,0 +1,45 @@
+import pytest
+
+from utils.json_repair import (close_json, drop_trailing_commas, extract_json_span, parse_json,
+                               repair_json)
+
+
+def test_valid_json_is_not_marked_repaired():
+    assert repair_json('{"a": 1}') == ({"a": 1}, False)
+
+
+def test_code_fences_and_surrounding_prose_are_dropped():
+    text = 'Here you go:\n```json\n{"skills": ["python", "sql"]}\n```\nAnything else?'
+    assert repair_json(text) == ({"skills": ["python", "sql"]}, True)
+    assert extract_json_span('Result: {"a": {"b": 2}} done') == '{"a": {"b": 2}}'
+
+
+def test_trailing_commas_are_removed():
+    assert parse_json('{"a": [1, 2, ], "b": 3, }') == {"a": [1, 2], "b": 3}
+
+
+def test_commas_inside_strings_are_kept():
+    text = '{"summary": "Python, ]Go, }Rust", "tags": ["a,]", "b" ,]}'
+    assert drop_trailing_commas(text) == '{"summary": "Python, ]Go, }Rust", "tags": ["a,]", "b" ]}'
+    assert parse_json(text) == {"summary": "Python, ]Go, }Rust", "tags": ["a,]", "b"]}
+
+
+def test_escaped_quotes_do_not_end_a_string():
+    text = r'{"quote": "said \", ]", "n": [1,]}'
+    assert parse_json(text) == {"quote": 'said ", ]', "n": [1]}
+
+
+def test_truncated_output_is_closed():
+    assert close_json('{"name": "Ada", "skills": ["py') == '{"name": "Ada", "skills": ["py"]}'
+    assert close_json('{"a": [1, 2,') == '{"a": [1, 2]}'
+    assert close_json('{"a":') == '{"a": null}'
+    assert parse_json('{"name": "Ada", "skills": ["python", ') == {"name": "Ada", "skills": ["python"]}
+
+
+def test_python_literals_are_accepted():
+    assert parse_json("['a', 'b', None, True]") == ["a", "b", None, True]
+
+
+def test_unrepairable_output_raises():
+    with pytest.raises(ValueError):
+        parse_json("no json here")
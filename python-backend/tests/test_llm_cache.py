@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from langchain_core.prompts import PromptTemplate
+
+from utils import llm_client
+from utils.disk_cache import DiskCache
+
+
+def _spec(version="1", model="model-a", cache_ttl=60, json_mode=False):
+    return llm_client.PromptSpec("cache_test", PromptTemplate.from_template("Rate {resume}"), version, model,
+                                 cache_ttl=cache_ttl, json_mode=json_mode)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "llm"))
+    monkeypatch.setattr(llm_client, "response_cache", cache)
+    return cache
+
+
+def test_key_changes_with_model_version_and_prompt():
+    rendered = _spec().render({"resume": "Ada"})
+    key = _spec().cache_key(rendered)
+    assert key == _spec().cache_key(rendered)
+    assert key != _spec(version="2").cache_key(rendered)
+    assert key != _spec(model="model-b").cache_key(rendered)
+    assert key != _spec().cache_key(_spec().render({"resume": "Grace"}))
+
+
+def test_stored_completion_is_served_until_the_version_changes(cache):
+    llm_client._store(_spec(), "Rate Ada", "8/10")
+    assert llm_client._cached(_spec(), "Rate Ada") == "8/10"
+    assert llm_client._cached(_spec(version="2"), "Rate Ada") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_uncacheable_completions_are_not_stored(cache):
+    llm_client._store(_spec(cache_ttl=0), "Rate Ada", "8/10")
+    llm_client._store(_spec(), "Rate Grace", "   ")
+    llm_client._store(_spec(json_mode=True), "Rate Linus", "not json at all")
+    assert llm_client._cached(_spec(), "Rate Ada") is None
+    assert llm_client._cached(_spec(), "Rate Grace") is None
+    assert llm_client._cached(_spec(json_mode=True), "Rate Linus") is None
+
+
+def test_entries_expire_after_their_ttl(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    cache.put("a" * 64, "value", ttl=0.05)
+    assert cache.get("a" * 64) == "value"
+    time.sleep(0.1)
+    assert cache.get("a" * 64) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=200)
+    keys = [str(n) * 64 for n in range(1, 5)]
+    for key in keys:
+        cache.put(key, "x" * 40)
+        # Reads bump the mtime, which orders eviction; sleep so each bump is visible
+        time.sleep(0.02)
+        cache.get(keys[0])
+        time.sleep(0.02)
+    assert cache.get(keys[0]) == "x" * 40
+    assert cache.get(keys[1]) is None
+    assert cache.stats()["evictions"] >= 1
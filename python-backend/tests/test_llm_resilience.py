@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+
+from langchain_core.prompts import PromptTemplate
+
+from utils import llm_client
+from utils.llm_backends import LatencyDistribution, StubBackend
+from utils.llm_resilience import CircuitBreaker, LLMTimeoutError, get_breaker, run_hedged
+
+
+def _half_open(breaker):
+    breaker.opened_at = time.monotonic() - breaker.reset_after
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failures=3, reset_after=60)
+    breaker.failure()
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    breaker.failure()
+    assert breaker.state == "closed"
+    breaker.failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_admits_one_trial():
+    breaker = CircuitBreaker("test", failures=1, reset_after=60)
+    breaker.failure()
+    _half_open(breaker)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_trial_success_closes_and_failure_reopens():
+    breaker = CircuitBreaker("test", failures=1, reset_after=60)
+    breaker.failure()
+    _half_open(breaker)
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open"
+
+    _half_open(breaker)
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_release_frees_trial_without_counting():
+    breaker = CircuitBreaker("test", failures=1, reset_after=60)
+    breaker.failure()
+    _half_open(breaker)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.failures == 1
+    assert breaker.allow()
+
+
+def test_cancelled_half_open_trial_is_released():
+    stub = StubBackend(LatencyDistribution("fixed:1000"))
+    spec = llm_client.PromptSpec(name="breaker_test", prompt=PromptTemplate.from_template("hi"),
+                                 version="1", model="trial-model", timeout=30)
+    breaker = get_breaker(stub.name, spec.model)
+    breaker.failure()
+    breaker.opened_at = time.monotonic() - breaker.reset_after - 1
+    # What _primary_allowed does before the attempt starts
+    assert breaker.allow()
+
+    async def lose_to_hedge():
+        task = asyncio.ensure_future(llm_client._aattempt(stub, spec, "hi")())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(lose_to_hedge())
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_run_hedged_prefers_first_answer():
+    def slow():
+        time.sleep(0.5)
+        return "primary"
+
+    result, hedged = run_hedged(slow, lambda: "hedge", hedge_after=0.05, timeout=2)
+    assert (result, hedged) == ("hedge", True)
+
+
+def test_run_hedged_times_out():
+    with pytest.raises(LLMTimeoutError):
+        run_hedged(lambda: time.sleep(1), None, hedge_after=0, timeout=0.1)
@@ -0,0 +1,110 @@
+import threading
+import time
+
+from utils import llm_scheduler
+from utils.llm_scheduler import BATCH, INTERACTIVE, LLMScheduler
+
+
+def _start(scheduler, tokens, priority, admitted):
+    def call():
+        scheduler.acquire(tokens, priority)
+        admitted.append(priority)
+
+    thread = threading.Thread(target=call, daemon=True)
+    thread.start()
+    return thread
+
+
+def _refill(scheduler, requests=None, tokens=None):
+    with scheduler._cond:
+        if requests is not None:
+            scheduler.requests.level = requests
+        if tokens is not None:
+            scheduler.tokens.level = tokens
+        scheduler._cond.notify_all()
+
+
+def _wait_queued(scheduler, count):
+    deadline = time.monotonic() + 1
+    while len(scheduler._queue) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(scheduler._queue) == count
+
+
+def test_interactive_calls_overtake_queued_batch_calls():
+    scheduler = LLMScheduler(rpm=60, tpm=60000, reserve=0.2)
+    _refill(scheduler, requests=0)
+    admitted = []
+    batch = _start(scheduler, 100, BATCH, admitted)
+    _wait_queued(scheduler, 1)
+    interactive = _start(scheduler, 100, INTERACTIVE, admitted)
+    _wait_queued(scheduler, 2)
+
+    # One request token: it goes to the interactive call although the batch call queued first
+    _refill(scheduler, requests=1)
+    interactive.join(1)
+    assert admitted == [INTERACTIVE]
+    assert batch.is_alive()
+
+    _refill(scheduler, requests=1)
+    batch.join(1)
+    assert admitted == [INTERACTIVE, BATCH]
+    assert scheduler.stats()["admitted"] == {"interactive": 1, "batch": 1}
+
+
+def test_batch_calls_leave_the_interactive_reserve():
+    scheduler = LLMScheduler(rpm=600, tpm=1000, reserve=0.2)
+    scheduler.acquire(800, BATCH)
+    assert scheduler.tokens.level <= 200
+
+    admitted = []
+    batch = _start(scheduler, 10, BATCH, admitted)
+    batch.join(0.2)
+    # The last 200 tokens are held back for interactive calls
+    assert batch.is_alive()
+
+    _refill(scheduler, tokens=1000)
+    batch.join(1)
+    assert admitted == [BATCH]
+
+
+def test_interactive_calls_may_use_the_reserve():
+    scheduler = LLMScheduler(rpm=600, tpm=1000, reserve=0.2)
+    scheduler.acquire(800, BATCH)
+    started = time.monotonic()
+    scheduler.acquire(150, INTERACTIVE)
+    assert time.monotonic() - started < 0.1
+
+
+def test_call_larger_than_the_bucket_is_admitted():
+    scheduler = LLMScheduler(rpm=600, tpm=1000, reserve=0.2)
+    started = time.monotonic()
+    scheduler.acquire(5000, INTERACTIVE)
+    assert time.monotonic() - started < 0.1
+    assert scheduler.tokens.level <= 1
+
+
+def test_backoff_pauses_the_queue():
+    scheduler = LLMScheduler(rpm=600, tpm=60000)
+    assert scheduler.backoff(0, retry_after=0.3) == 0.3
+    started = time.monotonic()
+    scheduler.acquire(10, INTERACTIVE)
+    assert time.monotonic() - started >= 0.29
+    assert scheduler.stats()["rate_limited"] == 1
+
+
+def test_settle_returns_overestimated_tokens():
+    scheduler = LLMScheduler(rpm=600, tpm=1000)
+    scheduler.acquire(600, INTERACTIVE)
+    scheduler.settle(600, 100)
+    assert scheduler.tokens.level >= 900
+
+
+def test_share_budget_splits_limits_across_processes(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "GROQ_RPM", 30)
+    monkeypatch.setattr(llm_scheduler, "GROQ_TPM", 6000)
+    monkeypatch.setattr(llm_scheduler, "_schedulers", {})
+    llm_scheduler.share_budget(4)
+    scheduler = llm_scheduler.get_scheduler("model")
+    assert scheduler.requests.capacity == 7
+    assert scheduler.tokens.capacity == 1500
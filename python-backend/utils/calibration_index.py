@@ -0,0 +1,185 @@
+"""Nearest-neighbour index over past evaluations, for picking scoring calibration context.
+
+Each evaluation's job description is embedded once, when it is added, with
+CALIBRATION_EMBED_MODEL. The normalized vectors go into a faiss HNSW graph keyed by the
+history row id, so a lookup costs about O(log n) whatever the size of the history.
+Scoring asks for the evaluations whose job is most similar to the current job
+description. Matches below CALIBRATION_MIN_SIMILARITY are dropped, and the rest are
+rendered as compact summaries until CALIBRATION_TOKEN_BUDGET is used up.
+
+The history store stays the source of truth. Before each add or search, the index
+embeds any rows it has not seen yet. That covers evaluations written by other worker
+processes and rows imported from the legacy JSON file. The graph is saved to
+CALIBRATION_INDEX every CALIBRATION_SAVE_EVERY additions and on shutdown, so a restart
+only embeds rows added since the last save. Rows removed by history compaction stay in
+the graph and are skipped at lookup; the graph is rebuilt at startup once more than half
+of it is stale.
+"""
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import faiss
+import numpy as np
+
+from utils.history_store import HistoryStore, history
+from utils.resume_compaction import count_tokens
+
+CALIBRATION_INDEX = os.getenv("CALIBRATION_INDEX", "resume_history.faiss")
+CALIBRATION_EMBED_MODEL = os.getenv("CALIBRATION_EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+CALIBRATION_TOP_K = int(os.getenv("CALIBRATION_TOP_K", "3"))
+CALIBRATION_MIN_SIMILARITY = float(os.getenv("CALIBRATION_MIN_SIMILARITY", "0.3"))
+CALIBRATION_TOKEN_BUDGET = int(os.getenv("CALIBRATION_TOKEN_BUDGET", "600"))
+CALIBRATION_SAVE_EVERY = int(os.getenv("CALIBRATION_SAVE_EVERY", "100"))
+# HNSW graph degree and search breadth; higher is more accurate and slower
+HNSW_M = int(os.getenv("CALIBRATION_HNSW_M", "32"))
+HNSW_EF_SEARCH = int(os.getenv("CALIBRATION_HNSW_EF_SEARCH", "64"))
+
+# Characters of a job description that are embedded and shown in the context
+JOB_CHARS = 500
+SUMMARY_JOB_CHARS = 160
+# Rows embedded per batch while catching up with the history store
+SYNC_BATCH = 256
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    """The sentence embedding model, loaded on first use."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer(CALIBRATION_EMBED_MODEL)
+        return _model
+
+
+def _embed(texts: List[str]) -> np.ndarray:
+    vectors = _get_model().encode(texts, batch_size=64, normalize_embeddings=True)
+    return np.asarray(vectors, dtype="float32")
+
+
+@lru_cache(maxsize=128)
+def _embed_query(job_text: str) -> np.ndarray:
+    # A batch of resumes is usually scored against one job description
+    return _embed([job_text])
+
+
+def _job_text(job_description: str) -> str:
+    return " ".join(str(job_description or "").split())[:JOB_CHARS]
+
+
+def _summary(record: Dict[str, Any], similarity: float) -> Dict[str, Any]:
+    """What the scoring prompt needs from a past evaluation: the job, the scores and why."""
+    result = record.get("result") or {}
+    return {
+        "job": _job_text(record.get("job_description"))[:SUMMARY_JOB_CHARS],
+        "similarity": round(similarity, 2),
+        "total_score": result.get("total_score"),
+        "scores": result.get("scores"),
+        "strengths_summary": result.get("strengths_summary"),
+    }
+
+
+class CalibrationIndex:
+    def __init__(self, store: HistoryStore, path: str = CALIBRATION_INDEX):
+        self.store = store
+        self.path = path
+        self._lock = threading.Lock()
+        self._index = None
+        self._last_id = 0
+        self._unsaved = 0
+
+    def _new_index(self):
+        dimension = _get_model().get_sentence_embedding_dimension()
+        graph = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        return faiss.IndexIDMap(graph)
+
+    def _use(self, index) -> None:
+        faiss.downcast_index(index.index).hnsw.efSearch = HNSW_EF_SEARCH
+        self._index = index
+
+    def _load(self) -> None:
+        """Read the saved graph, or start an empty one; caller holds the lock."""
+        if os.path.exists(self.path):
+            try:
+                index = faiss.read_index(self.path)
+                ids = faiss.vector_to_array(index.id_map)
+                # Mostly compacted-away rows: cheaper to rebuild than to keep skipping them
+                if len(ids) <= 2 * max(self.store.count(), 1):
+                    self._use(index)
+                    self._last_id = int(ids.max()) if len(ids) else 0
+                    return
+                print(f"Rebuilding {self.path}: most of its {len(ids)} entries were compacted away")
+            except RuntimeError as e:
+                print(f"[WARN] Could not read {self.path}, rebuilding: {e}")
+        self._use(self._new_index())
+        self._last_id = 0
+
+    def _sync(self) -> None:
+        """Embed and add history rows not yet in the graph; caller holds the lock."""
+        if self._index is None:
+            self._load()
+        while True:
+            rows = self.store.since(self._last_id, SYNC_BATCH)
+            if not rows:
+                break
+            ids = np.array([row_id for row_id, _ in rows], dtype="int64")
+            vectors = _embed([_job_text(record.get("job_description")) for _, record in rows])
+            self._index.add_with_ids(vectors, ids)
+            self._last_id = int(ids[-1])
+            self._unsaved += len(rows)
+        if self._unsaved >= CALIBRATION_SAVE_EVERY:
+            self._save()
+
+    def _save(self) -> None:
+        if self._index is None or not self._unsaved:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Written aside and renamed, so another worker never reads a half-written file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        faiss.write_index(self._index, tmp_path)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+
+    def add(self, record: Dict[str, Any]) -> int:
+        """Store an evaluation in the history and index it; returns its id."""
+        row_id = self.store.append(record)
+        with self._lock:
+            self._sync()
+        return row_id
+
+    def search(self, job_description: str, k: int = CALIBRATION_TOP_K) -> List[Tuple[Dict[str, Any], float]]:
+        """Up to k (evaluation, similarity) pairs for the most similar jobs, best first."""
+        query = _embed_query(_job_text(job_description))
+        with self._lock:
+            self._sync()
+            if not self._index.ntotal:
+                return []
+            # Over-fetch so k remain after skipping rows removed by compaction
+            similarities, ids = self._index.search(query, 2 * k)
+        hits = [(int(row_id), float(similarity)) for row_id, similarity in zip(ids[0], similarities[0])
+                if row_id != -1 and similarity >= CALIBRATION_MIN_SIMILARITY]
+        records = self.store.get_many(row_id for row_id, _ in hits)
+        return [(records[row_id], similarity) for row_id, similarity in hits if row_id in records][:k]
+
+    def context(self, job_description: str, k: int = CALIBRATION_TOP_K,
+                token_budget: int = CALIBRATION_TOKEN_BUDGET) -> str:
+        """The most similar past evaluations as JSON, within token_budget; "" if none match."""
+        summaries = []
+        for record, similarity in self.search(job_description, k):
+            candidate = json.dumps(summaries + [_summary(record, similarity)], indent=2)
+            if count_tokens(candidate) > token_budget:
+                break
+            summaries.append(_summary(record, similarity))
+        return json.dumps(summaries, indent=2) if summaries else ""
+
+    def close(self) -> None:
+        with self._lock:
+            self._save()
+
+
+calibration = CalibrationIndex(history)
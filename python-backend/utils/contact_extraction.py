@@ -0,0 +1,143 @@
+import datetime
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.resume_sections import match_heading
+
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"\(?\+?\d[\d \-().]{8,18}\d")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[A-Za-z0-9\-_%]+/?", re.I)
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+_POINT = r"(?:(?:{month})\.?[\s,'’\-]*|\d{{1,2}}\s*[/\-.]\s*)?(?:19|20)\d{{2}}".format(month=_MONTH)
+_ONGOING = r"present|current(?:ly)?|now|today|till\s+date|to\s+date|ongoing|date"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_POINT})\s*(?:-|–|—|to|till|until)\s*(?P<end>{_POINT}|{_ONGOING})",
+    re.I,
+)
+# Two-column layouts interleave education into the experience section; such ranges are not work
+EDUCATION_HINT_RE = re.compile(
+    r"\b(bachelor|master|b\.?\s?tech|m\.?\s?tech|b\.?e\b|degree|university|college|school|"
+    r"institute|cgpa|gpa|hsc|ssc|intermediate|diploma)",
+    re.I,
+)
+# Title and label lines ("Software Developer", "PERSONAL DETAILS") look just like a name line
+TITLE_WORDS = {
+    "developer", "engineer", "manager", "analyst", "designer", "consultant", "intern", "architect",
+    "administrator", "lead", "tester", "specialist", "executive", "resume", "curriculum", "vitae",
+    "personal", "details", "contact", "information", "profile",
+}
+
+
+def _first_match(pattern, texts: Iterable[str]) -> Optional[str]:
+    for text in texts:
+        match = pattern.search(text)
+        if match:
+            return match.group(0)
+    return None
+
+
+def extract_email(text: str, links: Iterable[str] = ()) -> Optional[str]:
+    mailtos = [link[len("mailto:"):] for link in links if link.lower().startswith("mailto:")]
+    return _first_match(EMAIL_RE, [*mailtos, text])
+
+
+def extract_phone(text: str) -> Optional[str]:
+    for match in PHONE_RE.finditer(text):
+        digits = re.sub(r"\D", "", match.group(0))
+        # 10-digit national numbers up to country code + 10; shorter runs are dates or pin codes
+        if 10 <= len(digits) <= 13:
+            return match.group(0).strip()
+    return None
+
+
+def extract_linkedin(text: str, links: Iterable[str] = ()) -> Optional[str]:
+    return _first_match(LINKEDIN_RE, [*links, text])
+
+
+def extract_name(header: str) -> Optional[str]:
+    """The first short line of capitalised words at the top of the resume, if there is one."""
+    for line in header.splitlines()[:6]:
+        line = line.strip()
+        if re.fullmatch(r"\S( {1,2}\S){2,}", line):  # "A N K I T  V E R M A"
+            line = " ".join(word.replace(" ", "") for word in re.split(r" {2,}", line))
+        words = line.split()
+        if not 2 <= len(words) <= 4 or match_heading(line):
+            continue
+        if any(word.lower().strip(".-") in TITLE_WORDS for word in words):
+            continue
+        if all(re.fullmatch(r"[A-Z][A-Za-z.'\-]*", word) for word in words):
+            return " ".join(words)
+    return None
+
+
+def _parse_point(text: str, today: datetime.date) -> Optional[Tuple[int, int]]:
+    text = text.strip().lower()
+    if re.fullmatch(_ONGOING, text, re.I):
+        return today.year, today.month
+    year = int(re.search(r"(?:19|20)\d{2}", text).group(0))
+    month_name = re.match(r"[a-z]{3}", text)
+    if month_name and month_name.group(0) in _MONTHS:
+        return year, _MONTHS[month_name.group(0)]
+    month_number = re.match(r"(\d{1,2})\s*[/\-.]", text)
+    if month_number and 1 <= int(month_number.group(1)) <= 12:
+        return year, int(month_number.group(1))
+    return year, 1
+
+
+def experience_intervals(text: str, today: Optional[datetime.date] = None) -> List[Tuple[int, int]]:
+    """Date ranges in the text as (start, end) month indices, both inclusive, overlaps merged."""
+    today = today or datetime.date.today()
+    now = today.year * 12 + today.month
+    intervals = []
+    for match in DATE_RANGE_RE.finditer(text):
+        # The range's own line plus the two above it (degree, institution)
+        context_start = text.rfind("\n", 0, text.rfind("\n", 0, text.rfind("\n", 0, match.start())))
+        context = text[context_start + 1:text.find("\n", match.end()) % (len(text) + 1)]
+        if EDUCATION_HINT_RE.search(context):
+            continue
+        start = _parse_point(match.group("start"), today)
+        end = _parse_point(match.group("end"), today)
+        begin, finish = start[0] * 12 + start[1], end[0] * 12 + end[1]
+        if start[0] >= 1970 and begin <= finish <= now:
+            intervals.append((begin, finish))
+
+    merged = []
+    for begin, finish in sorted(intervals):
+        if merged and begin <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], finish))
+        else:
+            merged.append((begin, finish))
+    return merged
+
+
+def total_experience_years(experience_text: str, today: Optional[datetime.date] = None) -> Optional[float]:
+    """Years covered by the date ranges of an experience section (overlapping roles count once)."""
+    intervals = experience_intervals(experience_text, today)
+    if not intervals:
+        return None
+    # Both end months count: "Jan 2022 - Dec 2022" is 12 months
+    months = sum(finish - begin + 1 for begin, finish in intervals)
+    return round(months / 12, 1)
+
+
+def extract_contact_fields(text: str, sections: Dict[str, str], links: Iterable[str] = ()) -> Dict[str, object]:
+    """Fields that can be read deterministically; anything not found is left for the LLM."""
+    links = list(links)
+    header = sections.get("header") or "\n".join(text.splitlines()[:10])
+    fields = {
+        "name": extract_name(header),
+        "email": extract_email(text, links),
+        "contact_no": extract_phone(text),
+        "linkedin_profile_link": extract_linkedin(text, links),
+        # Only the experience section; education date ranges would inflate the total
+        "total_experience_years": (
+            total_experience_years(sections["experience"]) if sections.get("experience") else None
+        ),
+    }
+    return {key: value for key, value in fields.items() if value is not None}
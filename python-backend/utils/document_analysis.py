@@ -0,0 +1,146 @@
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+import fitz  # PyMuPDF
+
+
+# A page whose text layer has fewer characters than this is treated as scanned; some exporters
+# draw the body as vector outlines and leave only a name or footer (~60 chars) as real text
+MIN_PAGE_TEXT_CHARS = int(os.getenv("MIN_PAGE_TEXT_CHARS", "100"))
+# Pages mostly covered by images are OCR'd unless their text layer is substantial
+IMAGE_DOMINANT_RATIO = float(os.getenv("IMAGE_DOMINANT_RATIO", "0.6"))
+IMAGE_DOMINANT_MAX_TEXT_CHARS = int(os.getenv("IMAGE_DOMINANT_MAX_TEXT_CHARS", "300"))
+
+
+# get_text("dict") without embedded image bytes; text and layout come from the same call
+LAYOUT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+@dataclass
+class TextLine:
+    """One line of the text layer with the typography used to spot section headings."""
+    text: str
+    size: float
+    bold: bool
+
+
+@dataclass
+class PageAnalysis:
+    """Everything later parsing steps need to know about a single page."""
+    number: int
+    text: str
+    text_chars: int
+    image_count: int
+    image_area_ratio: float
+    lines: List[TextLine] = field(default_factory=list)
+    # URIs of link annotations (mailto:, LinkedIn, ...); the visible text is often just "Email" or an icon
+    links: List[str] = field(default_factory=list)
+
+    @property
+    def needs_ocr(self) -> bool:
+        """True for text-less pages and image-dominated pages with a thin text layer."""
+        if self.text_chars < MIN_PAGE_TEXT_CHARS:
+            return True
+        return (self.image_area_ratio >= IMAGE_DOMINANT_RATIO
+                and self.text_chars < IMAGE_DOMINANT_MAX_TEXT_CHARS)
+
+
+@dataclass
+class DocumentAnalysis:
+    """Result of a single pass over a PDF: per-page text and image statistics."""
+    source: str
+    pages: List[PageAnalysis] = field(default_factory=list)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def text(self) -> str:
+        return "".join(page.text + "\n" for page in self.pages)
+
+    @property
+    def text_chars(self) -> int:
+        return sum(page.text_chars for page in self.pages)
+
+    @property
+    def image_count(self) -> int:
+        return sum(page.image_count for page in self.pages)
+
+    @property
+    def has_images(self) -> bool:
+        return self.image_count > 0
+
+    @property
+    def links(self) -> List[str]:
+        return [link for page in self.pages for link in page.links]
+
+    @property
+    def ocr_pages(self) -> List[int]:
+        return [page.number for page in self.pages if page.needs_ocr]
+
+
+def _image_area_ratio(page) -> float:
+    """Fraction of the page area covered by placed images (capped at 1.0)."""
+    page_area = abs(page.rect)
+    if not page_area:
+        return 0.0
+    covered = 0.0
+    for info in page.get_image_info():
+        covered += abs(fitz.Rect(info["bbox"]) & page.rect)
+    return min(covered / page_area, 1.0)
+
+
+def _layout_lines(page) -> List[TextLine]:
+    """Text-layer lines in page.get_text() order, each with its largest font size and bold flag."""
+    lines = []
+    for block in page.get_text("dict", flags=LAYOUT_FLAGS)["blocks"]:
+        for line in block.get("lines", []):
+            spans = line["spans"]
+            visible = [span for span in spans if span["text"].strip()] or spans
+            lines.append(TextLine(
+                text="".join(span["text"] for span in spans),
+                size=max((span["size"] for span in visible), default=0.0),
+                # flags bit 4 is bold; some fonts only say so in their name
+                bold=bool(visible) and all(
+                    span["flags"] & 16 or "bold" in span["font"].lower() for span in visible
+                ),
+            ))
+    return lines
+
+
+def open_document(source: Union[str, bytes]):
+    """Open a PDF from a path or straight from an in-memory buffer (no temp file)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    return fitz.open(source)
+
+
+def analyze_document(source: Union[str, bytes], name: Optional[str] = None) -> DocumentAnalysis:
+    """Open a PDF once and collect text, text-layer size and image coverage for every page."""
+    if name is None:
+        name = "<stream>" if isinstance(source, (bytes, bytearray, memoryview)) else os.path.basename(source)
+    analysis = DocumentAnalysis(source=name)
+    with open_document(source) as doc:
+        for page in doc:
+            lines = _layout_lines(page)
+            text = "".join(line.text + "\n" for line in lines)
+            analysis.pages.append(PageAnalysis(
+                number=page.number,
+                text=text,
+                text_chars=len(text.strip()),
+                image_count=len(page.get_images(full=True)),
+                image_area_ratio=_image_area_ratio(page),
+                lines=lines,
+                links=[link["uri"] for link in page.get_links() if link.get("uri")],
+            ))
+    return analysis
+
+
+def extract_pages(source: Union[str, bytes], page_numbers: List[int]) -> bytes:
+    """Build a PDF containing only the given (0-based) pages, in order."""
+    with open_document(source) as doc, fitz.open() as subset:
+        for number in page_numbers:
+            subset.insert_pdf(doc, from_page=number, to_page=number)
+        return subset.tobytes()
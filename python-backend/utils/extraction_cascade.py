@@ -0,0 +1,96 @@
+import os
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from utils import ocr_service
+from utils.document_analysis import MIN_PAGE_TEXT_CHARS, DocumentAnalysis
+
+
+# Whole-document budget for OCR escalation, and per-stage caps inside it (seconds)
+CASCADE_BUDGET = float(os.getenv("CASCADE_BUDGET", "60"))
+FAST_OCR_DEADLINE = float(os.getenv("FAST_OCR_DEADLINE", "20"))
+HI_RES_DEADLINE = float(os.getenv("HI_RES_DEADLINE", "45"))
+
+# Stages in escalation order; each OCR stage is a job kind of the OCR service
+STAGES = ("text_layer", "fast_ocr", "hi_res")
+OCR_ENGINES = {"fast_ocr": "fast", "hi_res": "hi_res"}
+
+
+@dataclass
+class CascadeResult:
+    """Best text per page, which stage produced it, and how each stage went."""
+    page_texts: Dict[int, str]
+    page_stages: Dict[int, str]
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def stage(self) -> str:
+        """The furthest stage whose output was kept for at least one page."""
+        used = set(self.page_stages.values())
+        return max(used, key=STAGES.index) if used else "text_layer"
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "stage": self.stage,
+            "timings_ms": self.timings_ms,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+        }
+
+
+def _unresolved_pages(result: CascadeResult, pages: List[int], page_texts: Dict[int, str]) -> List[int]:
+    """Pages the next stage should retry: this stage read no text from them (it timed out,
+    failed or came back empty), or they are still short."""
+    return [n for n in pages
+            if not page_texts.get(n, "").strip() or len(result.page_texts[n].strip()) < MIN_PAGE_TEXT_CHARS]
+
+
+def run_cascade(data: bytes, analysis: DocumentAnalysis, text_layer_ms: float = 0.0,
+                budget: float = CASCADE_BUDGET) -> CascadeResult:
+    """Escalate only the pages that need it: text layer -> fast OCR -> hi_res.
+
+    Each OCR stage gets min(its own deadline, what is left of the budget). When a stage
+    times out or fails, the best text seen so far for every page is returned.
+    """
+    deadline = time.monotonic() + budget
+    result = CascadeResult(
+        page_texts={page.number: page.text for page in analysis.pages},
+        page_stages={page.number: "text_layer" for page in analysis.pages},
+        timings_ms={"text_layer": round(text_layer_ms, 1)},
+    )
+
+    pending = analysis.ocr_pages
+    for stage, stage_deadline in (("fast_ocr", FAST_OCR_DEADLINE), ("hi_res", HI_RES_DEADLINE)):
+        remaining = deadline - time.monotonic()
+        if not pending or remaining <= 0:
+            break
+        timeout = min(stage_deadline, remaining)
+        started = time.monotonic()
+        future = None
+        try:
+            future = ocr_service.submit(OCR_ENGINES[stage], bytes(data), list(pending), queue_timeout=timeout)
+            page_texts = future.result(timeout=max(timeout - (time.monotonic() - started), 0))
+        except (FutureTimeoutError, ocr_service.OCRBusyError):
+            # A job still queued is dropped; one already running finishes in the background
+            if future is not None:
+                future.cancel()
+            result.timed_out.append(stage)
+            page_texts = {}
+        except Exception as e:
+            print(f"{stage} failed for {analysis.source}: {e}")
+            result.failed.append(stage)
+            page_texts = {}
+        result.timings_ms[stage] = round((time.monotonic() - started) * 1000, 1)
+
+        # Keep whichever stage read more of each page
+        for number, text in page_texts.items():
+            if len(text.strip()) > len(result.page_texts[number].strip()):
+                result.page_texts[number] = text
+                result.page_stages[number] = stage
+        pending = _unresolved_pages(result, pending, page_texts)
+
+    return result
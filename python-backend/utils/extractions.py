@@ -1,15 +1,10 @@
 from sentence_transformers import SentenceTransformer, util
-import io
-import numpy as np
-from PIL import Image
-import cv2
 import re
-from paddleocr import PaddleOCR
+from utils.document_analysis import analyze_document
+from utils.ocr_service import ocr_image, ocr_pdf_pages
 
 
 
-ocr = PaddleOCR(use_angle_cls=True, lang='en')
-
 model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
 
 known_skills = list(set([
@@ -44,18 +39,12 @@ def extract_skills_from_resume(resume_text, similarity_threshold=0.4):
 
     return sorted(extracted_skills)
 
-def extract_text_from_pdf(file_bytes):
-    full_text = ""
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                full_text += text + "\n"
-    return full_text.strip()
-
-def extract_text_from_image(image_bytes):
-    image = Image.open(io.BytesIO(image_bytes))
-    image_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-    results = ocr.ocr(image_cv)
-    text = "\n".join([line[1][0] for line in results[0]])
-    return text
+def extract_text_from_pdf(file_bytes, timeout=None):
+    # Text layer first; only scanned pages go to the OCR pool
+    analysis = analyze_document(file_bytes)
+    page_texts = {page.number: page.text for page in analysis.pages}
+    page_texts.update(ocr_pdf_pages(file_bytes, analysis.ocr_pages, timeout=timeout))
+    return "\n".join(page_texts[page.number] for page in analysis.pages).strip()
+
+def extract_text_from_image(image_bytes, timeout=None):
+    return ocr_image(image_bytes, timeout=timeout)
@@ -0,0 +1,209 @@
+import io
+import re
+import struct
+import zipfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from utils.resume_sections import segment_text
+
+
+@dataclass
+class ParsedDocument:
+    """Plain text of a resume plus its sections (skills, experience, ...) keyed by canonical name."""
+    text: str
+    sections: Dict[str, str] = field(default_factory=dict)
+    # Hyperlink targets embedded in the document (mailto:, https://linkedin.com/in/...)
+    links: List[str] = field(default_factory=list)
+    # How the text was obtained: producing stage, per-stage timings, stages that timed out
+    extraction: Dict[str, object] = field(default_factory=dict)
+
+
+# Extractors take the raw upload bytes plus its filename and return a ParsedDocument (or None)
+Extractor = Callable[[bytes, str], Optional[ParsedDocument]]
+
+EXTRACTORS: Dict[str, Extractor] = {}
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+
+def register_extractor(fmt: str):
+    """Decorator that registers an extractor for a format returned by detect_format."""
+    def decorator(func: Extractor) -> Extractor:
+        EXTRACTORS[fmt] = func
+        return func
+    return decorator
+
+
+def get_extractor(fmt: Optional[str]) -> Optional[Extractor]:
+    return EXTRACTORS.get(fmt)
+
+
+def detect_format(data: bytes) -> Optional[str]:
+    """Identify a resume by its magic bytes rather than by the (often wrong) file extension."""
+    # Some generators put junk before the PDF header; the spec allows it within the first 1KB
+    if PDF_MAGIC in data[:1024]:
+        return "pdf"
+    if data.startswith(ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            return None
+        return None
+    if data.startswith(OLE_MAGIC):
+        return "doc"
+    return None
+
+
+# --- DOCX -----------------------------------------------------------------
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _docx_part_lines(stream):
+    """Stream paragraphs and table rows out of one WordprocessingML part.
+
+    Table rows come out as a single line with cells separated by " | ", which
+    keeps skill matrices and date/role tables readable for the LLM.
+    """
+    lines = []
+    paragraph = []
+    cells = []
+    cell = []
+    table_depth = 0
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == W_NS + "tbl":
+                table_depth += 1
+            continue
+
+        if tag == W_NS + "t":
+            paragraph.append(elem.text or "")
+        elif tag == W_NS + "tab":
+            paragraph.append("\t")
+        elif tag in (W_NS + "br", W_NS + "cr"):
+            paragraph.append("\n")
+        elif tag == W_NS + "p":
+            text = "".join(paragraph).strip()
+            paragraph = []
+            if text:
+                (cell if table_depth else lines).append(text)
+        elif tag == W_NS + "tc":
+            cells.append(" ".join(cell))
+            cell = []
+        elif tag == W_NS + "tr":
+            row = " | ".join(c for c in cells if c)
+            cells = []
+            if row:
+                lines.append(row)
+        elif tag == W_NS + "tbl":
+            table_depth -= 1
+        # Drop finished subtrees so memory stays flat on long documents
+        if tag in (W_NS + "p", W_NS + "tbl"):
+            elem.clear()
+    return lines
+
+
+def _docx_links(archive) -> List[str]:
+    """External hyperlink targets; Word stores them in the relationship parts, not in the text."""
+    links = []
+    for name in archive.namelist():
+        if not re.fullmatch(r"word/_rels/(document|header\d*)\.xml\.rels", name):
+            continue
+        with archive.open(name) as stream:
+            for rel in ET.parse(stream).getroot().iter(REL_NS + "Relationship"):
+                if rel.get("TargetMode") == "External" and rel.get("Target"):
+                    links.append(rel.get("Target"))
+    return links
+
+
+@register_extractor("docx")
+def extract_docx_text(data: bytes, filename: str = "") -> Optional[ParsedDocument]:
+    """Read a .docx straight from the zip: headers first (contact details often live there), then the body."""
+    lines = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = archive.namelist()
+        parts = sorted(n for n in names if re.fullmatch(r"word/header\d*\.xml", n))
+        parts.append("word/document.xml")
+        for part in parts:
+            with archive.open(part) as stream:
+                lines.extend(_docx_part_lines(stream))
+        links = _docx_links(archive)
+    text = "\n".join(lines)
+    return ParsedDocument(text, segment_text(text), links) if text else None
+
+
+# --- Legacy DOC (Word 97-2003) --------------------------------------------
+
+def _clean_doc_text(text: str) -> str:
+    # Fields are \x13 code \x14 result \x15; keep the result, drop the code (fields can nest)
+    previous = None
+    while previous != text:
+        previous = text
+        text = re.sub(r"\x13[^\x13\x14\x15]*\x14([^\x13\x14\x15]*)\x15", r"\1", text)
+        text = re.sub(r"\x13[^\x13\x14\x15]*\x15", "", text)
+    text = text.replace("\r", "\n").replace("\x0b", "\n").replace("\x0c", "\n").replace("\x07", "\t")
+    text = re.sub(r"[\x00-\x08\x0e-\x1f]", "", text)
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+@register_extractor("doc")
+def extract_doc_text(data: bytes, filename: str = "") -> Optional[ParsedDocument]:
+    """Pull the main-document text out of a Word 97-2003 file via its piece table."""
+    import olefile
+
+    with olefile.OleFileIO(data) as ole:
+        word = ole.openstream("WordDocument").read()
+        flags = struct.unpack_from("<H", word, 0x0A)[0]
+        if flags & 0x0100:
+            raise ValueError(f"Encrypted .doc files are not supported: {filename}")
+        table = ole.openstream("1Table" if flags & 0x0200 else "0Table").read()
+
+    # FIB: 32-byte FibBase, then three length-prefixed arrays (FibRgW97, FibRgLw97, FibRgFcLcb)
+    pos = 32
+    csw = struct.unpack_from("<H", word, pos)[0]
+    pos += 2 + csw * 2
+    cslw = struct.unpack_from("<H", word, pos)[0]
+    pos += 2
+    ccp_text = struct.unpack_from("<i", word, pos + 3 * 4)[0]
+    pos += cslw * 4 + 2
+    fc_clx, lcb_clx = struct.unpack_from("<II", word, pos + 33 * 8)
+    clx = table[fc_clx:fc_clx + lcb_clx]
+
+    # Clx: any number of Prc entries (0x01) followed by the Pcdt (0x02) holding the piece table
+    i = 0
+    while i < len(clx) and clx[i] == 0x01:
+        i += 3 + struct.unpack_from("<h", clx, i + 1)[0]
+    if i >= len(clx) or clx[i] != 0x02:
+        raise ValueError(f"No piece table found in {filename}")
+    lcb = struct.unpack_from("<I", clx, i + 1)[0]
+    plc = clx[i + 5:i + 5 + lcb]
+    pieces = (lcb - 4) // 12
+    cps = struct.unpack_from(f"<{pieces + 1}I", plc, 0)
+
+    parts = []
+    remaining = ccp_text
+    for k in range(pieces):
+        if remaining <= 0:
+            break
+        fc = struct.unpack_from("<I", plc, (pieces + 1) * 4 + k * 8 + 2)[0]
+        count = min(cps[k + 1] - cps[k], remaining)
+        if fc & 0x40000000:
+            # Compressed piece: one cp1252 byte per character at fc / 2
+            start = (fc & 0x3FFFFFFF) // 2
+            parts.append(word[start:start + count].decode("cp1252", errors="replace"))
+        else:
+            start = fc & 0x3FFFFFFF
+            parts.append(word[start:start + 2 * count].decode("utf-16-le", errors="replace"))
+        remaining -= count
+
+    text = _clean_doc_text("".join(parts))
+    return ParsedDocument(text, segment_text(text)) if text else None
@@ -0,0 +1,136 @@
+"""Append-only store of resume evaluations, used as calibration context for scoring.
+
+Evaluations are rows in a SQLite database in WAL mode. An append is a single-row
+insert, so its cost does not grow with the history. Readers never block the writer.
+SQLite's own file locking serializes writers across worker processes; a writer
+waits up to HISTORY_BUSY_TIMEOUT seconds for the lock rather than failing. Recent
+entries are read newest-first through the rowid index.
+
+Every HISTORY_COMPACT_EVERY appends (per process), rows beyond the newest
+HISTORY_MAX_ROWS are deleted and the WAL file is checkpointed and truncated.
+
+On first use an existing resume_history.json (the previous format) is imported.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+HISTORY_DB = os.getenv("HISTORY_DB", "resume_history.db")
+HISTORY_LEGACY_JSON = os.getenv("HISTORY_LEGACY_JSON", "resume_history.json")
+HISTORY_MAX_ROWS = int(os.getenv("HISTORY_MAX_ROWS", "1000000"))
+HISTORY_COMPACT_EVERY = int(os.getenv("HISTORY_COMPACT_EVERY", "1000"))
+HISTORY_BUSY_TIMEOUT = float(os.getenv("HISTORY_BUSY_TIMEOUT", "10"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    record TEXT NOT NULL
+)
+"""
+
+
+class HistoryStore:
+    def __init__(self, path: str = HISTORY_DB, max_rows: int = HISTORY_MAX_ROWS,
+                 compact_every: int = HISTORY_COMPACT_EVERY):
+        self.path = path
+        self.max_rows = max_rows
+        self.compact_every = compact_every
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._appends = 0
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+        self._import_legacy(HISTORY_LEGACY_JSON)
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection (sqlite3 connections must not be shared across threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=HISTORY_BUSY_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL keeps committed appends durable across crashes at NORMAL; only power loss can drop the last few
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _import_legacy(self, json_path: str) -> None:
+        if not os.path.exists(json_path):
+            return
+        conn = self._connect()
+        with conn:
+            # BEGIN IMMEDIATE takes the write lock, so two processes starting together import once
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM evaluations LIMIT 1").fetchone():
+                return
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    records = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Could not import {json_path}: {e}")
+                return
+            modified = os.path.getmtime(json_path)
+            conn.executemany(
+                "INSERT INTO evaluations (created_at, record) VALUES (?, ?)",
+                [(modified, json.dumps(record)) for record in records],
+            )
+        print(f"Imported {len(records)} evaluations from {json_path} into {self.path}")
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Store one evaluation; returns its id."""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO evaluations (created_at, record) VALUES (?, ?)",
+                (time.time(), json.dumps(record)),
+            )
+        with self._lock:
+            self._appends += 1
+            due = self.compact_every and self._appends % self.compact_every == 0
+        if due:
+            self.compact()
+        return cursor.lastrowid
+
+    def recent(self, limit: int = 3) -> List[Dict[str, Any]]:
+        """The newest limit evaluations, oldest first."""
+        rows = self._connect().execute(
+            "SELECT record FROM evaluations ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [json.loads(record) for (record,) in reversed(rows)]
+
+    def get_many(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Evaluations by id; ids that were compacted away are missing from the result."""
+        ids = list(ids)
+        if not ids:
+            return {}
+        rows = self._connect().execute(
+            f"SELECT id, record FROM evaluations WHERE id IN ({','.join('?' * len(ids))})", ids
+        ).fetchall()
+        return {row_id: json.loads(record) for row_id, record in rows}
+
+    def since(self, after_id: int, limit: int = 1000) -> List[Tuple[int, Dict[str, Any]]]:
+        """Up to limit (id, evaluation) pairs with ids above after_id, oldest first."""
+        rows = self._connect().execute(
+            "SELECT id, record FROM evaluations WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+        ).fetchall()
+        return [(row_id, json.loads(record)) for row_id, record in rows]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def compact(self) -> None:
+        """Drop all but the newest max_rows evaluations and shrink the WAL file."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "DELETE FROM evaluations WHERE id <= (SELECT MAX(id) FROM evaluations) - ?",
+                (self.max_rows,),
+            )
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+history = HistoryStore()
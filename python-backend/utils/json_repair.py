@@ -0,0 +1,122 @@
+import ast
+import json
+import re
+from typing import Any, Iterator, List, Optional, Tuple
+
+
+_FENCE_RE = re.compile(r"```(?:json|python)?\s*(.*?)(?:```|$)", re.S | re.I)
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def strip_code_fences(text: str) -> str:
+    match = _FENCE_RE.search(text)
+    return match.group(1) if match else text
+
+
+def _walk(text: str, start: int) -> Iterator[Tuple[int, str, bool]]:
+    """Yield (index, char, inside a string after char) for text[start:]."""
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        yield i, ch, in_string
+
+
+def _scan(text: str, start: int) -> Tuple[Optional[int], List[str], bool]:
+    """Walk a JSON value from text[start]; return (end index or None, open brackets, inside a string)."""
+    stack = []
+    in_string = False
+    for i, ch, in_string in _walk(text, start):
+        if in_string or ch == '"':
+            continue
+        if ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]" and stack:
+            stack.pop()
+            if not stack:
+                return i, stack, False
+    return None, stack, in_string
+
+
+def extract_json_span(text: str) -> str:
+    """The first JSON object or array in text (prose before and after dropped); may be unterminated."""
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("no JSON object or array in output")
+    start = min(starts)
+    end, _, _ = _scan(text, start)
+    return text[start:] if end is None else text[start:end + 1]
+
+
+def drop_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing bracket; commas inside strings are left alone."""
+    trailing = set()
+    comma = None
+    for i, ch, in_string in _walk(text, 0):
+        if in_string or ch == '"':
+            comma = None
+        elif ch == ",":
+            comma = i
+        elif ch in "}]" and comma is not None:
+            trailing.add(comma)
+            comma = None
+        elif not ch.isspace():
+            comma = None
+    return "".join(ch for i, ch in enumerate(text) if i not in trailing)
+
+
+def close_json(fragment: str) -> str:
+    """Terminate a truncated value: close an open string, drop a dangling comma, close brackets."""
+    _, stack, in_string = _scan(fragment, 0)
+    if in_string:
+        fragment += '"'
+    fragment = fragment.rstrip()
+    if fragment.endswith(","):
+        fragment = fragment[:-1]
+    elif fragment.endswith(":"):
+        fragment += " null"
+    return fragment + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> Tuple[Any, bool]:
+    """Parse LLM output as JSON, repairing it step by step only as far as needed.
+
+    Returns (value, repaired). Raises ValueError if nothing parses.
+    """
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    candidate = strip_code_fences(text).strip()
+    steps = [
+        lambda s: s,
+        extract_json_span,
+        drop_trailing_commas,
+        close_json,
+        drop_trailing_commas,
+    ]
+    for step in steps:
+        candidate = step(candidate)
+        try:
+            return json.loads(candidate), True
+        except ValueError:
+            continue
+
+    # Python-literal output (single quotes, True/None) from prompts that used to ask for a Python list
+    try:
+        return ast.literal_eval(candidate), True
+    except (ValueError, SyntaxError):
+        raise ValueError(f"unrepairable JSON output: {text[:200]!r}")
+
+
+def parse_json(text: str) -> Any:
+    return repair_json(text)[0]
@@ -0,0 +1,238 @@
+"""Where completions come from, selected with LLM_BACKEND.
+
+- groq (default): the live Groq API.
+- stub: a local stand-in that needs no network or key. It returns each prompt's
+  registered stub_reply (or filler text) after a delay drawn from LLM_STUB_LATENCY.
+  The delays are seeded by LLM_STUB_SEED, so a benchmark run is repeatable.
+- record: calls Groq and also writes every completion, with its latency, to LLM_RECORD_DIR.
+- replay: serves completions from LLM_RECORD_DIR and waits the recorded latency
+  (set LLM_REPLAY_TIMING=none to skip the wait). A prompt that was never recorded raises
+  ReplayMissError.
+
+Recordings are keyed like the response cache (model, prompt name and version, rendered
+prompt), so a replay only matches the exact calls that were recorded. Calls answered from
+the response cache never reach the backend, so record with LLM_CACHE_TTL=0 to capture
+everything. The stub and replay backends are not rate-limited, their completions get their
+own response cache and parsed-resume cache keys, and their evaluations are not saved to the
+scoring history.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from utils.disk_cache import DiskCache
+from utils.resume_compaction import count_tokens
+
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+# fixed:<ms> | uniform:<min ms>:<max ms> | normal:<mean ms>:<stddev ms> | lognormal:<median ms>:<sigma>
+LLM_STUB_LATENCY = os.getenv("LLM_STUB_LATENCY", "lognormal:800:0.4")
+LLM_STUB_SEED = int(os.getenv("LLM_STUB_SEED", "0"))
+LLM_RECORD_DIR = os.getenv("LLM_RECORD_DIR", os.path.join("cache", "llm_recordings"))
+LLM_REPLAY_TIMING = os.getenv("LLM_REPLAY_TIMING", "recorded")
+
+# Backends whose completions are real Groq output
+REAL_BACKENDS = ("groq", "record")
+
+# Share of a streamed completion's latency spent before the first chunk
+FIRST_CHUNK_SHARE = 0.3
+
+
+class ReplayMissError(LookupError):
+    """The replay backend has no recording for this call."""
+
+
+def _usage(prompt: str, text: str) -> Dict[str, int]:
+    input_tokens, output_tokens = count_tokens(prompt), count_tokens(text)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens}
+
+
+def _chunks(text: str) -> List[str]:
+    """Split a completion into word-sized stream chunks."""
+    words = text.split(" ")
+    return [word + " " for word in words[:-1]] + [words[-1]]
+
+
+class GroqBackend:
+    name = "groq"
+    rate_limited = True
+
+    def __init__(self, get_llm: Callable):
+        self.get_llm = get_llm
+
+    def _runnable(self, spec):
+        # The request gives up at the prompt's deadline too, so an attempt abandoned by
+        # run_hedged does not hold its thread and connection until the client's 60s timeout
+        llm = self.get_llm(spec.model).bind(timeout=spec.timeout)
+        return llm.bind(response_format={"type": "json_object"}) if spec.json_mode else llm
+
+    def invoke(self, spec, rendered: str) -> AIMessage:
+        return self._runnable(spec).invoke(rendered)
+
+    async def ainvoke(self, spec, rendered: str) -> AIMessage:
+        return await self._runnable(spec).ainvoke(rendered)
+
+    async def astream(self, spec, rendered: str) -> AsyncIterator[AIMessageChunk]:
+        # Groq's JSON mode does not stream, so every prompt streams as a plain completion
+        async for chunk in self.get_llm(spec.model).bind(timeout=spec.timeout).astream(rendered):
+            yield chunk
+
+
+class LatencyDistribution:
+    """Delays in seconds from a LLM_STUB_LATENCY description, drawn from one seeded generator."""
+
+    def __init__(self, description: str, seed: int = 0):
+        kind, *params = description.split(":")
+        params = [float(p) for p in params]
+        samplers = {
+            "fixed": lambda: params[0],
+            "uniform": lambda: self._random.uniform(params[0], params[1]),
+            "normal": lambda: self._random.gauss(params[0], params[1]),
+            "lognormal": lambda: params[0] * self._random.lognormvariate(0, params[1]),
+        }
+        if kind not in samplers:
+            raise ValueError(f"unknown latency distribution: {description!r}")
+        self._sample = samplers[kind]
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            return max(self._sample(), 0.0) / 1000
+
+
+class StubBackend:
+    name = "stub"
+    rate_limited = False
+
+    def __init__(self, latency: LatencyDistribution):
+        self.latency = latency
+
+    def reply(self, spec, rendered: str) -> str:
+        if spec.stub_reply is not None:
+            return spec.stub_reply
+        if spec.json_mode:
+            return "{}"
+        # Filler about half the prompt's completion budget long, so token accounting stays realistic
+        return " ".join(["lorem"] * (spec.max_output_tokens // 2))
+
+    def _message(self, spec, rendered: str) -> AIMessage:
+        text = self.reply(spec, rendered)
+        return AIMessage(content=text, usage_metadata=_usage(rendered, text))
+
+    def invoke(self, spec, rendered: str) -> AIMessage:
+        time.sleep(self.latency.sample())
+        return self._message(spec, rendered)
+
+    async def ainvoke(self, spec, rendered: str) -> AIMessage:
+        await asyncio.sleep(self.latency.sample())
+        return self._message(spec, rendered)
+
+    async def astream(self, spec, rendered: str) -> AsyncIterator[AIMessageChunk]:
+        chunks = _chunks(self.reply(spec, rendered))
+        delay = self.latency.sample()
+        await asyncio.sleep(delay * FIRST_CHUNK_SHARE)
+        for chunk in chunks:
+            yield AIMessageChunk(content=chunk)
+            await asyncio.sleep(delay * (1 - FIRST_CHUNK_SHARE) / len(chunks))
+
+
+class RecordBackend:
+    name = "record"
+    rate_limited = True
+
+    def __init__(self, inner: GroqBackend, recordings: DiskCache):
+        self.inner = inner
+        self.recordings = recordings
+
+    def _save(self, spec, rendered: str, text: str, usage: Optional[Dict], latency: float) -> None:
+        self.recordings.put(spec.cache_key(rendered), {
+            "prompt": spec.name,
+            "version": spec.version,
+            "model": spec.model,
+            "text": text,
+            "usage": usage,
+            "latency_ms": round(latency * 1000),
+        })
+
+    def invoke(self, spec, rendered: str) -> AIMessage:
+        started = time.monotonic()
+        message = self.inner.invoke(spec, rendered)
+        self._save(spec, rendered, message.content, message.usage_metadata, time.monotonic() - started)
+        return message
+
+    async def ainvoke(self, spec, rendered: str) -> AIMessage:
+        started = time.monotonic()
+        message = await self.inner.ainvoke(spec, rendered)
+        self._save(spec, rendered, message.content, message.usage_metadata, time.monotonic() - started)
+        return message
+
+    async def astream(self, spec, rendered: str) -> AsyncIterator[AIMessageChunk]:
+        started = time.monotonic()
+        chunks = []
+        async for chunk in self.inner.astream(spec, rendered):
+            chunks.append(chunk.content)
+            yield chunk
+        self._save(spec, rendered, "".join(chunks), None, time.monotonic() - started)
+
+
+class ReplayBackend:
+    name = "replay"
+    rate_limited = False
+
+    def __init__(self, recordings: DiskCache, timing: str = LLM_REPLAY_TIMING):
+        self.recordings = recordings
+        self.timing = timing
+
+    def _recording(self, spec, rendered: str) -> Dict:
+        recording = self.recordings.get(spec.cache_key(rendered))
+        if recording is None:
+            raise ReplayMissError(f"no recording for {spec.name} v{spec.version} on {spec.model}")
+        return recording
+
+    def _delay(self, recording: Dict) -> float:
+        return recording["latency_ms"] / 1000 if self.timing == "recorded" else 0.0
+
+    def _message(self, rendered: str, recording: Dict) -> AIMessage:
+        usage = recording.get("usage") or _usage(rendered, recording["text"])
+        return AIMessage(content=recording["text"], usage_metadata=usage)
+
+    def invoke(self, spec, rendered: str) -> AIMessage:
+        recording = self._recording(spec, rendered)
+        time.sleep(self._delay(recording))
+        return self._message(rendered, recording)
+
+    async def ainvoke(self, spec, rendered: str) -> AIMessage:
+        recording = self._recording(spec, rendered)
+        await asyncio.sleep(self._delay(recording))
+        return self._message(rendered, recording)
+
+    async def astream(self, spec, rendered: str) -> AsyncIterator[AIMessageChunk]:
+        recording = self._recording(spec, rendered)
+        chunks = _chunks(recording["text"])
+        delay = self._delay(recording)
+        await asyncio.sleep(delay * FIRST_CHUNK_SHARE)
+        for chunk in chunks:
+            yield AIMessageChunk(content=chunk)
+            await asyncio.sleep(delay * (1 - FIRST_CHUNK_SHARE) / len(chunks))
+
+
+def create_backend(name: str, get_llm: Callable):
+    """The backend called name; get_llm(model) returns the shared ChatGroq for a model."""
+    if name == "groq":
+        return GroqBackend(get_llm)
+    if name == "stub":
+        return StubBackend(LatencyDistribution(LLM_STUB_LATENCY, LLM_STUB_SEED))
+    # Recordings are kept until deleted by hand, so no TTL and a generous size cap
+    recordings = DiskCache(LLM_RECORD_DIR, max_bytes=int(os.getenv("LLM_RECORD_MAX_MB", "512")) * 1024 * 1024)
+    if name == "record":
+        return RecordBackend(GroqBackend(get_llm), recordings)
+    if name == "replay":
+        return ReplayBackend(recordings)
+    raise ValueError(f"unknown LLM_BACKEND: {name!r} (expected groq, stub, record or replay)")
@@ -0,0 +1,596 @@
+"""One Groq client and prompt registry for every agent.
+
+All agents share a ChatGroq per model, backed by pooled keep-alive httpx clients, so
+connections (and their TLS handshakes) are reused across calls and across agents.
+Prompts are registered once at import with register_prompt() and called by name with
+invoke() / ainvoke(), which return the completion text.
+
+Completions are cached on disk by model, prompt name and version, and a hash of the
+rendered prompt, so a verbatim repeat (same rejection email, same default availability
+string, same job description) skips the round trip. Bump a prompt's version whenever
+its wording changes. Identical calls that are in flight at the same time are coalesced
+into one request.
+
+Every request that does reach Groq first passes the per-model rate limiter in
+utils/llm_scheduler.py, in the priority class its prompt was registered with.
+
+Prompts registered with json_mode=True are sent with Groq's JSON mode and read with
+invoke_json() / ainvoke_json(): the reply is repaired locally (code fences, trailing
+commas, truncation) before a new call is ever spent, and only replies that parse are
+cached.
+
+astream() yields completion text as Groq produces it, for the Server-Sent Events
+endpoints; a cache hit is yielded in one piece.
+
+Each prompt runs on the model its task is routed to in utils/llm_routing.py (a small
+model for parsing and templated text, the large one for scoring), and the latency of
+every call is recorded per prompt.
+
+Calls have per-prompt timeouts and retry budgets, can be hedged to a second backend,
+and fail fast while a backend's circuit breaker is open (utils/llm_resilience.py).
+
+Every call, cache hits included, is accounted to the endpoint that made it (tokens, queue
+wait, wall time) by utils/llm_usage.py.
+
+LLM_BACKEND swaps Groq for a local stub or a record/replay store (utils/llm_backends.py)
+so the pipeline can be benchmarked offline; each backend gets its own response cache.
+"""
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+from groq import APIConnectionError, InternalServerError, RateLimitError
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_groq import ChatGroq
+
+from utils.disk_cache import DiskCache, content_key
+from utils.llm_backends import LLM_BACKEND, REAL_BACKENDS, create_backend
+from utils import llm_resilience
+from utils.llm_resilience import (
+    LLM_HEDGE_BACKEND, LLM_HEDGE_DELAY, LLM_HEDGE_MIN_SAMPLES, LLM_HEDGE_MODEL, LLM_HEDGE_PERCENTILE,
+    LLM_TIMEOUT, LLM_TIMEOUT_RETRIES, CircuitOpenError, LLMTimeoutError, arun_hedged, get_breaker, run_hedged,
+)
+from utils.llm_routing import TIERS, latency, model_for
+from utils import llm_usage
+from utils.llm_usage import CallRecord
+from utils.json_repair import repair_json
+from utils import llm_scheduler
+from utils.llm_scheduler import BATCH, INTERACTIVE, LLM_MAX_RETRIES, get_scheduler
+from utils.resume_compaction import count_tokens
+from utils.single_flight import inflight
+
+
+# Model for callers of get_llm() that name none; prompts are routed by utils/llm_routing.py
+LLM_MODEL = TIERS["large"]
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "120"))
+# Default lifetime of a cached completion; a prompt can override it (0 disables caching)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+# Extra calls allowed when a JSON reply cannot be repaired locally
+LLM_JSON_RETRIES = int(os.getenv("LLM_JSON_RETRIES", "1"))
+
+# Stub and replayed completions must never be served as real ones (recording fills the real cache)
+response_cache = DiskCache(
+    os.getenv("LLM_CACHE_DIR", os.path.join("cache", "llm" if LLM_BACKEND in REAL_BACKENDS else f"llm-{LLM_BACKEND}")),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024,
+    ttl=LLM_CACHE_TTL,
+)
+
+_limits = httpx.Limits(
+    max_connections=LLM_MAX_CONNECTIONS,
+    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+    keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+)
+http_client = httpx.Client(limits=_limits, timeout=httpx.Timeout(60.0, connect=10.0))
+http_async_client = httpx.AsyncClient(limits=_limits, timeout=httpx.Timeout(60.0, connect=10.0))
+
+_models: Dict[str, ChatGroq] = {}
+
+
+def get_llm(model: str = LLM_MODEL) -> ChatGroq:
+    """The shared ChatGroq for a model, created on first use."""
+    if model not in _models:
+        _models[model] = ChatGroq(
+            model_name=model,
+            api_key=os.getenv("GROQ_API_KEY"),
+            http_client=http_client,
+            http_async_client=http_async_client,
+            # 429s are retried by our scheduler, which also pauses every other queued call
+            max_retries=0,
+        )
+    return _models[model]
+
+
+backend = create_backend(LLM_BACKEND, get_llm)
+hedge_backend = create_backend(LLM_HEDGE_BACKEND, get_llm) if LLM_HEDGE_BACKEND else None
+
+# Worth another attempt within a prompt's retry budget (APITimeoutError is an APIConnectionError)
+TRANSIENT_ERRORS = (LLMTimeoutError, APIConnectionError, InternalServerError)
+
+
+@dataclass
+class PromptSpec:
+    """A registered prompt: its template, version (bump on any wording change), model, cache TTL,
+    scheduling priority, a rough completion size used to reserve tokens-per-minute, the
+    reply the stub backend gives, and the timeout and retry budget of each call."""
+    name: str
+    prompt: PromptTemplate
+    version: str
+    model: str
+    cache_ttl: float = LLM_CACHE_TTL
+    priority: int = INTERACTIVE
+    max_output_tokens: int = 512
+    json_mode: bool = False
+    stub_reply: Optional[str] = None
+    timeout: float = LLM_TIMEOUT
+    retries: int = LLM_TIMEOUT_RETRIES
+
+    def render(self, variables: Dict[str, object]) -> str:
+        return self.prompt.format(**variables)
+
+    def cache_key(self, rendered: str) -> str:
+        return content_key(rendered.encode("utf-8"), self.model, self.name, self.version)
+
+
+PROMPTS: Dict[str, PromptSpec] = {}
+
+# Stub and replayed completions are not real output and must not be stored as if they were
+REAL_COMPLETIONS = LLM_BACKEND in REAL_BACKENDS
+
+
+def register_prompt(name: str, template: str, version: str = "1", model: Optional[str] = None,
+                    cache_ttl: Optional[float] = None, priority: int = INTERACTIVE,
+                    max_output_tokens: int = 512, json_mode: bool = False,
+                    stub_reply: Optional[str] = None, timeout: Optional[float] = None,
+                    retries: Optional[int] = None) -> PromptSpec:
+    """json_mode prompts must ask for a JSON object (Groq's JSON mode cannot return a bare array)
+    and should give a representative stub_reply, or the stub backend answers "{}".
+    model defaults to the one the routing table assigns this prompt; timeout (seconds per
+    attempt) and retries default to LLM_TIMEOUT and LLM_TIMEOUT_RETRIES."""
+    spec = PromptSpec(name, PromptTemplate.from_template(template), version, model or model_for(name),
+                      LLM_CACHE_TTL if cache_ttl is None else cache_ttl, priority, max_output_tokens,
+                      json_mode, stub_reply, LLM_TIMEOUT if timeout is None else timeout,
+                      LLM_TIMEOUT_RETRIES if retries is None else retries)
+    PROMPTS[name] = spec
+    return spec
+
+
+def completion_source(name: str) -> str:
+    """Backend and model a prompt's completions come from, for keying caches of results built on them."""
+    return f"{'groq' if REAL_COMPLETIONS else LLM_BACKEND}:{PROMPTS[name].model}"
+
+
+def _text(message: AIMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def complete(name: str, **variables) -> AIMessage:
+    """Run a registered prompt and return the full message (content plus usage metadata)."""
+    spec = PROMPTS[name]
+    return backend.invoke(spec, spec.render(variables))
+
+
+async def acomplete(name: str, **variables) -> AIMessage:
+    spec = PROMPTS[name]
+    return await backend.ainvoke(spec, spec.render(variables))
+
+
+def _cached(spec: PromptSpec, rendered: str) -> Optional[str]:
+    if not spec.cache_ttl:
+        return None
+    return response_cache.get(spec.cache_key(rendered))
+
+
+def _store(spec: PromptSpec, rendered: str, text: str) -> None:
+    if not spec.cache_ttl or not text.strip():
+        return
+    if spec.json_mode:
+        try:
+            repair_json(text)
+        except ValueError:
+            return
+    response_cache.put(spec.cache_key(rendered), text, ttl=spec.cache_ttl)
+
+
+def _retry_after(error: RateLimitError) -> Optional[float]:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _total_tokens(message: AIMessage) -> Optional[int]:
+    return (getattr(message, "usage_metadata", None) or {}).get("total_tokens")
+
+
+def _hedge_spec(spec: PromptSpec) -> PromptSpec:
+    return replace(spec, model=LLM_HEDGE_MODEL) if LLM_HEDGE_MODEL else spec
+
+
+def _hedge_after(spec: PromptSpec) -> float:
+    observed = latency.percentile(spec.name, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES)
+    return LLM_HEDGE_DELAY if observed is None else observed
+
+
+def _cacheable(spec: PromptSpec, hedged: bool) -> bool:
+    """A hedge's completion is cached only if it came from the same model on a real backend."""
+    return not hedged or (hedge_backend.name in REAL_BACKENDS and _hedge_spec(spec).model == spec.model)
+
+
+def _attempt(chosen, spec: PromptSpec, rendered: str, hedge: bool = False) -> Callable[[], AIMessage]:
+    """One call to a backend, reported to its circuit breaker; the primary's latency is recorded."""
+    breaker = get_breaker(chosen.name, spec.model)
+
+    def run() -> AIMessage:
+        if hedge:
+            if not breaker.allow():
+                raise CircuitOpenError(f"{chosen.name}:{spec.model} is failing")
+            if chosen.rate_limited:
+                # A hedge cannot wait in the queue, but its tokens still count against the limit
+                get_scheduler(spec.model).charge(count_tokens(rendered) + spec.max_output_tokens)
+        started = time.monotonic()
+        try:
+            message = chosen.invoke(spec, rendered)
+        except RateLimitError:
+            breaker.success()
+            raise
+        except Exception:
+            breaker.failure()
+            raise
+        elapsed = time.monotonic() - started
+        breaker.failure() if elapsed > spec.timeout else breaker.success()
+        if not hedge:
+            latency.record(spec.name, spec.model, elapsed)
+        return message
+    return run
+
+
+def _aattempt(chosen, spec: PromptSpec, rendered: str, hedge: bool = False) -> Callable[[], Awaitable[AIMessage]]:
+    breaker = get_breaker(chosen.name, spec.model)
+
+    async def run() -> AIMessage:
+        if hedge:
+            if not breaker.allow():
+                raise CircuitOpenError(f"{chosen.name}:{spec.model} is failing")
+            if chosen.rate_limited:
+                get_scheduler(spec.model).charge(count_tokens(rendered) + spec.max_output_tokens)
+        started = time.monotonic()
+        try:
+            message = await chosen.ainvoke(spec, rendered)
+        except asyncio.CancelledError:
+            # Cancelled at the deadline counts against the backend; losing to a hedge does not
+            if time.monotonic() - started >= spec.timeout:
+                breaker.failure()
+            else:
+                # Frees the half-open trial slot if this call held it
+                breaker.release()
+            raise
+        except RateLimitError:
+            breaker.success()
+            raise
+        except Exception:
+            breaker.failure()
+            raise
+        elapsed = time.monotonic() - started
+        breaker.failure() if elapsed > spec.timeout else breaker.success()
+        if not hedge:
+            latency.record(spec.name, spec.model, elapsed)
+        return message
+    return run
+
+
+def _primary_allowed(spec: PromptSpec) -> bool:
+    if get_breaker(backend.name, spec.model).allow():
+        return True
+    if hedge_backend is None:
+        raise CircuitOpenError(f"{backend.name}:{spec.model} is failing; not calling it for {spec.name}")
+    return False
+
+
+def _guarded_invoke(spec: PromptSpec, rendered: str) -> Tuple[AIMessage, bool]:
+    """Call the backend under the prompt's timeout, hedged if a hedge backend is configured."""
+    primary = _attempt(backend, spec, rendered) if _primary_allowed(spec) else None
+    hedge = _attempt(hedge_backend, _hedge_spec(spec), rendered, hedge=True) if hedge_backend else None
+    return run_hedged(primary, hedge, _hedge_after(spec), spec.timeout)
+
+
+async def _aguarded_invoke(spec: PromptSpec, rendered: str) -> Tuple[AIMessage, bool]:
+    primary = _aattempt(backend, spec, rendered) if _primary_allowed(spec) else None
+    hedge = _aattempt(hedge_backend, _hedge_spec(spec), rendered, hedge=True) if hedge_backend else None
+    return await arun_hedged(primary, hedge, _hedge_after(spec), spec.timeout)
+
+
+def _token_counts(message: AIMessage, rendered: str) -> Tuple[int, int]:
+    """(prompt, completion) tokens as reported by the backend, else estimated."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    return (usage.get("input_tokens") or count_tokens(rendered),
+            usage.get("output_tokens") or count_tokens(_text(message)))
+
+
+def _finish(spec: PromptSpec, rendered: str, record: CallRecord, message: AIMessage, hedged: bool) -> str:
+    prompt_tokens, completion_tokens = _token_counts(message, rendered)
+    record.done(prompt_tokens, completion_tokens, hedged=hedged,
+                model=_hedge_spec(spec).model if hedged else spec.model)
+    text = _text(message)
+    if _cacheable(spec, hedged):
+        _store(spec, rendered, text)
+    return text
+
+
+def _call(spec: PromptSpec, rendered: str) -> str:
+    record = CallRecord(spec.name, spec.model)
+    try:
+        message, hedged = _complete(spec, rendered, record)
+    except Exception as e:
+        record.done(error=e)
+        raise
+    return _finish(spec, rendered, record, message, hedged)
+
+
+def _complete(spec: PromptSpec, rendered: str, record: CallRecord) -> Tuple[AIMessage, bool]:
+    scheduler = get_scheduler(spec.model) if backend.rate_limited else None
+    estimate = count_tokens(rendered) + spec.max_output_tokens
+    rate_limited = failed = 0
+    while True:
+        if scheduler:
+            queued = time.monotonic()
+            scheduler.acquire(estimate, spec.priority)
+            record.waited(time.monotonic() - queued)
+        try:
+            message, hedged = _guarded_invoke(spec, rendered)
+        except RateLimitError as e:
+            if scheduler is None or rate_limited == LLM_MAX_RETRIES:
+                raise
+            scheduler.settle(estimate, 0)
+            delay = scheduler.backoff(rate_limited, _retry_after(e))
+            rate_limited += 1
+            print(f"[WARN] Groq rate limit on {spec.name}; retrying in {delay:.1f}s")
+            continue
+        except TRANSIENT_ERRORS as e:
+            if failed == spec.retries:
+                raise
+            failed += 1
+            print(f"[WARN] {spec.name} failed ({type(e).__name__}: {e}); retry {failed} of {spec.retries}")
+            continue
+        if scheduler:
+            scheduler.settle(estimate, _total_tokens(message))
+        return message, hedged
+
+
+async def _acall(spec: PromptSpec, rendered: str) -> str:
+    record = CallRecord(spec.name, spec.model)
+    try:
+        message, hedged = await _acomplete(spec, rendered, record)
+    except Exception as e:
+        record.done(error=e)
+        raise
+    return _finish(spec, rendered, record, message, hedged)
+
+
+async def _acomplete(spec: PromptSpec, rendered: str, record: CallRecord) -> Tuple[AIMessage, bool]:
+    scheduler = get_scheduler(spec.model) if backend.rate_limited else None
+    estimate = count_tokens(rendered) + spec.max_output_tokens
+    loop = asyncio.get_running_loop()
+    rate_limited = failed = 0
+    while True:
+        if scheduler:
+            # The scheduler blocks on a condition variable; wait for it off the event loop
+            queued = time.monotonic()
+            await loop.run_in_executor(None, scheduler.acquire, estimate, spec.priority)
+            record.waited(time.monotonic() - queued)
+        try:
+            message, hedged = await _aguarded_invoke(spec, rendered)
+        except RateLimitError as e:
+            if scheduler is None or rate_limited == LLM_MAX_RETRIES:
+                raise
+            scheduler.settle(estimate, 0)
+            delay = scheduler.backoff(rate_limited, _retry_after(e))
+            rate_limited += 1
+            print(f"[WARN] Groq rate limit on {spec.name}; retrying in {delay:.1f}s")
+            continue
+        except TRANSIENT_ERRORS as e:
+            if failed == spec.retries:
+                raise
+            failed += 1
+            print(f"[WARN] {spec.name} failed ({type(e).__name__}: {e}); retry {failed} of {spec.retries}")
+            continue
+        if scheduler:
+            scheduler.settle(estimate, _total_tokens(message))
+        return message, hedged
+
+
+def invoke(name: str, **variables) -> str:
+    """Run a registered prompt and return the completion text, from the response cache when possible."""
+    spec = PROMPTS[name]
+    rendered = spec.render(variables)
+    text = _cached(spec, rendered)
+    if text is None:
+        return inflight.do(spec.cache_key(rendered), _call, spec, rendered)
+    CallRecord(spec.name, spec.model).done(cached=True)
+    return text
+
+
+async def ainvoke(name: str, **variables) -> str:
+    spec = PROMPTS[name]
+    rendered = spec.render(variables)
+    text = _cached(spec, rendered)
+    if text is None:
+        return await inflight.ado(spec.cache_key(rendered), _acall, spec, rendered)
+    CallRecord(spec.name, spec.model).done(cached=True)
+    return text
+
+
+async def astream(name: str, **variables) -> AsyncIterator[str]:
+    """Yield the completion text of a registered prompt chunk by chunk.
+
+    Streams are not coalesced, and json_mode prompts are streamed as plain completions
+    (Groq's JSON mode does not stream), so callers parse the joined text with
+    utils.json_repair at the end. The full text is cached like invoke()'s.
+    """
+    spec = PROMPTS[name]
+    rendered = spec.render(variables)
+    text = _cached(spec, rendered)
+    if text is not None:
+        CallRecord(spec.name, spec.model).done(cached=True)
+        yield text
+        return
+
+    record = CallRecord(spec.name, spec.model)
+    scheduler = get_scheduler(spec.model) if backend.rate_limited else None
+    estimate = count_tokens(rendered) + spec.max_output_tokens
+    loop = asyncio.get_running_loop()
+    chunks = []
+    rate_limited = failed = 0
+    try:
+        while True:
+            if scheduler:
+                queued = time.monotonic()
+                await loop.run_in_executor(None, scheduler.acquire, estimate, spec.priority)
+                record.waited(time.monotonic() - queued)
+            started = time.monotonic()
+            try:
+                async for chunk in _stream_chunks(spec, rendered):
+                    chunks.append(chunk)
+                    yield chunk
+            except RateLimitError as e:
+                # Once text has gone out a retry would repeat it, so only a refused request is retried
+                if scheduler is None or chunks or rate_limited == LLM_MAX_RETRIES:
+                    raise
+                scheduler.settle(estimate, 0)
+                delay = scheduler.backoff(rate_limited, _retry_after(e))
+                rate_limited += 1
+                print(f"[WARN] Groq rate limit on {spec.name}; retrying in {delay:.1f}s")
+                continue
+            except TRANSIENT_ERRORS as e:
+                if chunks or failed == spec.retries:
+                    raise
+                failed += 1
+                print(f"[WARN] {spec.name} failed ({type(e).__name__}: {e}); retry {failed} of {spec.retries}")
+                continue
+            break
+    except Exception as e:
+        record.done(error=e)
+        raise
+    latency.record(spec.name, spec.model, time.monotonic() - started)
+    text = "".join(chunks)
+    prompt_tokens, completion_tokens = count_tokens(rendered), count_tokens(text)
+    record.done(prompt_tokens, completion_tokens)
+    if scheduler:
+        scheduler.settle(estimate, prompt_tokens + completion_tokens)
+    _store(spec, rendered, text)
+
+
+async def _stream_chunks(spec: PromptSpec, rendered: str) -> AsyncIterator[str]:
+    """The backend's stream, failing with LLMTimeoutError if it goes quiet for the prompt's timeout.
+
+    Streams are not hedged: text already sent to the client cannot be swapped for another reply.
+    """
+    breaker = get_breaker(backend.name, spec.model)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{backend.name}:{spec.model} is failing; not calling it for {spec.name}")
+    stream = backend.astream(spec, rendered).__aiter__()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(stream.__anext__(), spec.timeout)
+        except StopAsyncIteration:
+            breaker.success()
+            return
+        except asyncio.TimeoutError:
+            breaker.failure()
+            raise LLMTimeoutError(f"{spec.name}: no streamed output for {spec.timeout:g}s")
+        except RateLimitError:
+            breaker.success()
+            raise
+        except Exception:
+            breaker.failure()
+            raise
+        if chunk.content:
+            yield _text(chunk)
+
+
+_json_stats: Dict[str, Dict[str, int]] = {}
+_json_lock = threading.Lock()
+
+
+def _count(name: str, **increments) -> None:
+    with _json_lock:
+        stats = _json_stats.setdefault(name, {"calls": 0, "results": 0, "repaired": 0, "failed": 0})
+        for key, value in increments.items():
+            stats[key] += value
+
+
+def _parse_reply(spec: PromptSpec, text: str, attempt: int) -> Optional[Any]:
+    try:
+        value, repaired = repair_json(text)
+    except ValueError as e:
+        print(f"[WARN] {spec.name} returned unparseable JSON (attempt {attempt + 1}): {e}")
+        return None
+    _count(spec.name, results=1, repaired=int(repaired))
+    return value
+
+
+def invoke_json(name: str, **variables) -> Any:
+    """Run a json_mode prompt and return the parsed (locally repaired if needed) value."""
+    spec = PROMPTS[name]
+    for attempt in range(LLM_JSON_RETRIES + 1):
+        _count(name, calls=1)
+        value = _parse_reply(spec, invoke(name, **variables), attempt)
+        if value is not None:
+            return value
+    _count(name, failed=1)
+    raise ValueError(f"{name}: no parseable JSON after {LLM_JSON_RETRIES + 1} calls")
+
+
+async def ainvoke_json(name: str, **variables) -> Any:
+    spec = PROMPTS[name]
+    for attempt in range(LLM_JSON_RETRIES + 1):
+        _count(name, calls=1)
+        value = _parse_reply(spec, await ainvoke(name, **variables), attempt)
+        if value is not None:
+            return value
+    _count(name, failed=1)
+    raise ValueError(f"{name}: no parseable JSON after {LLM_JSON_RETRIES + 1} calls")
+
+
+def json_stats() -> Dict[str, Dict[str, object]]:
+    """Per prompt: calls made, parsed results, how many needed repair, and calls per result."""
+    with _json_lock:
+        return {
+            name: {**stats, "calls_per_result": round(stats["calls"] / stats["results"], 3) if stats["results"] else None}
+            for name, stats in _json_stats.items()
+        }
+
+
+def cache_stats() -> Dict[str, object]:
+    return {**response_cache.stats(), "backend": backend.name, "single_flight": inflight.stats(), "json": json_stats()}
+
+
+def scheduler_stats() -> Dict[str, object]:
+    return llm_scheduler.stats()
+
+
+def routing_stats() -> Dict[str, object]:
+    """The model every registered prompt runs on, and per-prompt call latency."""
+    return {
+        "tiers": TIERS,
+        "routes": {name: spec.model for name, spec in PROMPTS.items()},
+        "latency": latency.stats(),
+    }
+
+
+def usage_stats() -> Dict[str, object]:
+    return llm_usage.stats()
+
+
+def resilience_stats() -> Dict[str, object]:
+    return llm_resilience.stats()
+
+
+def close():
+    llm_resilience.shutdown()
+    http_client.close()
@@ -0,0 +1,207 @@
+"""Timeouts, hedged requests and circuit breakers for LLM calls.
+
+Every call has a deadline (its prompt's timeout). When a hedge backend is configured
+(LLM_HEDGE_BACKEND, optionally on LLM_HEDGE_MODEL), a call still unanswered after its
+prompt's LLM_HEDGE_PERCENTILE latency is sent again to the hedge backend, and whichever
+answers first wins. Until a prompt has LLM_HEDGE_MIN_SAMPLES latencies on record, the
+hedge waits LLM_HEDGE_DELAY seconds.
+
+Each backend and model pair has a circuit breaker. It opens after LLM_BREAKER_FAILURES
+consecutive failures, where an error or a reply slower than its deadline counts as a
+failure. While the breaker is open, calls fail fast with CircuitOpenError, or go
+straight to the hedge backend. After LLM_BREAKER_RESET seconds a single trial call is
+let through. If it succeeds the breaker closes again.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+# Extra attempts after a timeout or a connection/server error
+LLM_TIMEOUT_RETRIES = int(os.getenv("LLM_TIMEOUT_RETRIES", "1"))
+LLM_HEDGE_BACKEND = os.getenv("LLM_HEDGE_BACKEND", "")
+LLM_HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL", "")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "5"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+# Threads that run blocking calls so they can be timed out and hedged
+LLM_CALL_THREADS = int(os.getenv("LLM_CALL_THREADS", "32"))
+
+
+class LLMTimeoutError(TimeoutError):
+    """No backend answered before the prompt's timeout."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The backend is failing; the call was refused without being sent."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failures: int = LLM_BREAKER_FAILURES, reset_after: float = LLM_BREAKER_RESET):
+        self.name = name
+        self.max_failures = failures
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now; in half-open state only one trial call at a time."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def release(self) -> None:
+        """End a call that neither succeeded nor failed (cancelled after losing to a hedge)."""
+        with self._lock:
+            self.trial_running = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.max_failures:
+                if self.opened_at is None or self.trial_running:
+                    print(f"[WARN] Circuit breaker for {self.name} opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(backend_name: str, model: str) -> CircuitBreaker:
+    name = f"{backend_name}:{model}"
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = {"timeouts": 0, "hedges_sent": 0, "hedges_won": 0}
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            self.values[key] += 1
+
+
+counters = _Counters()
+_executor = ThreadPoolExecutor(max_workers=LLM_CALL_THREADS, thread_name_prefix="llm-call")
+
+
+def run_hedged(primary: Optional[Callable[[], Any]], hedge: Optional[Callable[[], Any]],
+               hedge_after: float, timeout: float) -> Tuple[Any, bool]:
+    """Run primary, starting hedge if primary has not answered after hedge_after seconds.
+
+    Returns (first successful result, whether the hedge produced it). If primary is None
+    the hedge runs alone. A slower attempt is abandoned rather than interrupted. Raises
+    LLMTimeoutError at the deadline, or the last error when every attempt failed.
+    """
+    deadline = time.monotonic() + timeout
+    futures = {}
+    if primary is not None:
+        futures[_executor.submit(primary)] = False
+        if hedge is not None:
+            wait(futures, timeout=min(hedge_after, timeout))
+    if hedge is not None and not any(f.done() and f.exception() is None for f in futures):
+        futures[_executor.submit(hedge)] = True
+        counters.add("hedges_sent")
+
+    last_error: Optional[BaseException] = None
+    while futures:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, _ = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            hedged = futures.pop(future)
+            if future.exception() is None:
+                if hedged:
+                    counters.add("hedges_won")
+                return future.result(), hedged
+            last_error = future.exception()
+    if futures or last_error is None:
+        counters.add("timeouts")
+        raise LLMTimeoutError(f"no LLM response within {timeout:g}s")
+    raise last_error
+
+
+async def arun_hedged(primary: Optional[Callable[[], Awaitable[Any]]], hedge: Optional[Callable[[], Awaitable[Any]]],
+                      hedge_after: float, timeout: float) -> Tuple[Any, bool]:
+    """Async run_hedged; the losing attempt is cancelled."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    tasks = {}
+    if primary is not None:
+        tasks[asyncio.ensure_future(primary())] = False
+        if hedge is not None:
+            await asyncio.wait(tasks, timeout=min(hedge_after, timeout))
+    if hedge is not None and not any(t.done() and not t.cancelled() and t.exception() is None for t in tasks):
+        tasks[asyncio.ensure_future(hedge())] = True
+        counters.add("hedges_sent")
+
+    last_error: Optional[BaseException] = None
+    try:
+        while tasks:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                hedged = tasks.pop(task)
+                if task.exception() is None:
+                    if hedged:
+                        counters.add("hedges_won")
+                    return task.result(), hedged
+                last_error = task.exception()
+        if tasks or last_error is None:
+            counters.add("timeouts")
+            raise LLMTimeoutError(f"no LLM response within {timeout:g}s")
+        raise last_error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def stats() -> Dict[str, object]:
+    with _breakers_lock:
+        breakers = {name: breaker.stats() for name, breaker in _breakers.items()}
+    with counters._lock:
+        values = dict(counters.values)
+    return {**values, "hedge_backend": LLM_HEDGE_BACKEND or None, "breakers": breakers}
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,95 @@
+"""Which model each prompt runs on, and how long each prompt's calls take.
+
+Prompts are routed to a tier rather than a model name: "small" for parsing and templated
+text, "large" for judgement calls such as resume scoring. The tiers map to
+LLM_SMALL_MODEL and LLM_LARGE_MODEL. A deployment can reroute any prompt with
+LLM_ROUTES, a comma-separated list of prompt=tier or prompt=<model name>, e.g.
+"resume_extraction=large,answer_feedback=llama3-70b-8192". Prompts not in the table run
+on the large tier.
+
+Each tier is a different Groq model with its own rate limits, so moving light prompts
+to the small tier also frees the large model's tokens-per-minute for scoring.
+"""
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+LLM_SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", "llama3-8b-8192")
+LLM_LARGE_MODEL = os.getenv("LLM_LARGE_MODEL", os.getenv("LLM_MODEL", "llama3-70b-8192"))
+# Latency samples kept per prompt for the percentiles
+LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+
+TIERS = {"small": LLM_SMALL_MODEL, "large": LLM_LARGE_MODEL}
+
+DEFAULT_ROUTES = {
+    "parse_availability": "small",
+    "candidate_message": "small",
+    "interview_questions": "small",
+    "answer_feedback": "small",
+    "resume_extraction": "small",
+    "resume_scoring": "large",
+    "resume_extract_and_score": "large",
+}
+
+
+def _parse_routes(spec: str) -> Dict[str, str]:
+    routes = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, target = item.partition("=")
+        if not target:
+            raise ValueError(f"LLM_ROUTES entry {item!r} is not prompt=tier")
+        routes[name.strip()] = target.strip()
+    return routes
+
+
+ROUTES = {**DEFAULT_ROUTES, **_parse_routes(os.getenv("LLM_ROUTES", ""))}
+
+
+def model_for(prompt_name: str) -> str:
+    """The model a prompt runs on: its route's tier, or a model named directly in LLM_ROUTES."""
+    target = ROUTES.get(prompt_name, "large")
+    return TIERS.get(target, target)
+
+
+class LatencyStats:
+    """Per-prompt latency of calls that reached the backend (cache hits are not counted)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._models: Dict[str, str] = {}
+
+    def record(self, prompt_name: str, model: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(prompt_name, deque(maxlen=self.window)).append(seconds)
+            self._counts[prompt_name] = self._counts.get(prompt_name, 0) + 1
+            self._models[prompt_name] = model
+
+    def percentile(self, prompt_name: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """The q-th percentile latency in seconds, or None with fewer than min_samples on record."""
+        with self._lock:
+            ordered = sorted(self._samples.get(prompt_name, ()))
+        if len(ordered) < max(min_samples, 1):
+            return None
+        return ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            result = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                result[name] = {
+                    "model": self._models[name],
+                    "calls": self._counts[name],
+                    "avg_ms": round(sum(ordered) / len(ordered) * 1000),
+                    "p50_ms": round(ordered[len(ordered) // 2] * 1000),
+                    "p95_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000),
+                }
+            return result
+
+
+latency = LatencyStats()
+
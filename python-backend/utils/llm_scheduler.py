@@ -0,0 +1,153 @@
+"""Client-side admission control for Groq calls.
+
+Groq enforces requests-per-minute and tokens-per-minute limits per model. Every call
+waits here for a request token and its estimated prompt + completion tokens before it
+is sent. Waiting calls are served strictly by priority class (interactive before batch)
+and FIFO within a class. Batch calls also leave LLM_INTERACTIVE_RESERVE of the token
+budget untouched, so candidate-facing calls never queue behind a bulk scoring run. A
+429 pauses the model's queue for the server's Retry-After (or an exponential backoff).
+"""
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+
+GROQ_RPM = int(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM = int(os.getenv("GROQ_TPM", "6000"))
+# Share of the token bucket that only interactive calls may use
+LLM_INTERACTIVE_RESERVE = float(os.getenv("LLM_INTERACTIVE_RESERVE", "0.2"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+
+INTERACTIVE = 0
+BATCH = 1
+
+
+class TokenBucket:
+    """capacity tokens, refilled continuously at capacity per minute."""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.level = capacity
+        self.rate = capacity / 60.0
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until the bucket holds amount (after refill)."""
+        missing = amount - self.level
+        return max(missing / self.rate, 0.0) if self.rate else float("inf")
+
+
+class LLMScheduler:
+    def __init__(self, rpm: int = GROQ_RPM, tpm: int = GROQ_TPM, reserve: float = LLM_INTERACTIVE_RESERVE):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.reserve = reserve * tpm
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self.admitted = {INTERACTIVE: 0, BATCH: 0}
+        self.waited_seconds = {INTERACTIVE: 0.0, BATCH: 0.0}
+        self.rate_limited = 0
+
+    def acquire(self, tokens: int, priority: int = INTERACTIVE) -> None:
+        """Block until this call may be sent; tokens is the estimated prompt + completion size."""
+        # A call larger than the whole bucket would wait forever; let it drain the bucket instead
+        tokens = min(tokens, self.tokens.capacity - (self.reserve if priority == BATCH else 0))
+        needed = tokens + (self.reserve if priority == BATCH else 0)
+        entry = (priority, next(self._seq))
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            while True:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                if self._queue[0] == entry and now >= self.paused_until:
+                    wait = max(self.requests.wait_time(1), self.tokens.wait_time(needed))
+                    if wait <= 0:
+                        heapq.heappop(self._queue)
+                        self.requests.level -= 1
+                        self.tokens.level -= tokens
+                        self.admitted[priority] += 1
+                        self.waited_seconds[priority] += now - started
+                        self._cond.notify_all()
+                        return
+                else:
+                    wait = max(self.paused_until - now, 0.05)
+                self._cond.wait(timeout=min(wait, 1.0))
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Correct the token bucket once the real usage of a call is known."""
+        if actual is None:
+            return
+        with self._cond:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated - actual)
+            self._cond.notify_all()
+
+    def charge(self, tokens: int) -> None:
+        """Debit a call that was sent without queueing (a hedged duplicate)."""
+        with self._cond:
+            self.requests.level -= 1
+            self.tokens.level -= tokens
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Pause the whole queue after a 429; returns the pause in seconds."""
+        delay = retry_after if retry_after is not None else min(2 ** attempt, 30) + random.uniform(0, 1)
+        with self._cond:
+            self.rate_limited += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            self._cond.notify_all()
+        return delay
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            now = time.monotonic()
+            self.tokens.refill(now)
+            self.requests.refill(now)
+            return {
+                "queued": len(self._queue),
+                "request_tokens": round(self.requests.level, 2),
+                "llm_tokens": round(self.tokens.level),
+                "paused_for_s": round(max(self.paused_until - now, 0.0), 2),
+                "rate_limited": self.rate_limited,
+                "admitted": {"interactive": self.admitted[INTERACTIVE], "batch": self.admitted[BATCH]},
+                "avg_wait_s": {
+                    "interactive": round(self.waited_seconds[INTERACTIVE] / (self.admitted[INTERACTIVE] or 1), 3),
+                    "batch": round(self.waited_seconds[BATCH] / (self.admitted[BATCH] or 1), 3),
+                },
+            }
+
+
+_schedulers: Dict[str, LLMScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def share_budget(processes: int) -> None:
+    """Limit this process to its share of GROQ_RPM/GROQ_TPM when processes callers use one key.
+
+    Call before the first LLM call; schedulers that already exist keep their budget.
+    """
+    global GROQ_RPM, GROQ_TPM
+    GROQ_RPM = max(GROQ_RPM // processes, 1)
+    GROQ_TPM = max(GROQ_TPM // processes, 1)
+
+
+def get_scheduler(model: str) -> LLMScheduler:
+    """Groq's limits are per model, so each model gets its own buckets."""
+    with _schedulers_lock:
+        if model not in _schedulers:
+            _schedulers[model] = LLMScheduler(GROQ_RPM, GROQ_TPM)
+        return _schedulers[model]
+
+
+def stats() -> Dict[str, object]:
+    return {model: scheduler.stats() for model, scheduler in _schedulers.items()}
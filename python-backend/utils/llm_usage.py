@@ -0,0 +1,145 @@
+"""Token and latency accounting for every LLM call, attributed to the endpoint that made it.
+
+The HTTP middleware in main.py stores the request path in current_endpoint. Every
+completion then records the following, which GET /llm-usage aggregates per endpoint
+and per prompt:
+
+- endpoint, prompt (task) and model
+- prompt and completion tokens
+- time spent waiting in the rate limiter queue
+- wall time
+- whether the call was served from the cache or by a hedge, and any error
+
+Each record is also appended as one JSON line to LLM_USAGE_LOG, which rotates at
+LLM_USAGE_LOG_MAX_MB and keeps LLM_USAGE_LOG_BACKUPS old files. Set LLM_USAGE_LOG to an
+empty string to turn the log off.
+
+Calls made outside a request (scripts, startup) are counted under "unattributed". A call
+that waited on an identical in-flight call is counted once, for the caller that made it.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional
+
+LLM_USAGE_LOG = os.getenv("LLM_USAGE_LOG", os.path.join("logs", "llm_usage.jsonl"))
+LLM_USAGE_LOG_MAX_MB = float(os.getenv("LLM_USAGE_LOG_MAX_MB", "10"))
+LLM_USAGE_LOG_BACKUPS = int(os.getenv("LLM_USAGE_LOG_BACKUPS", "5"))
+
+current_endpoint: ContextVar[str] = ContextVar("llm_endpoint", default="unattributed")
+
+_log = logging.getLogger("llm_usage")
+_log.propagate = False
+if LLM_USAGE_LOG and not _log.handlers:
+    os.makedirs(os.path.dirname(LLM_USAGE_LOG) or ".", exist_ok=True)
+    _handler = RotatingFileHandler(LLM_USAGE_LOG, maxBytes=int(LLM_USAGE_LOG_MAX_MB * 1024 * 1024),
+                                   backupCount=LLM_USAGE_LOG_BACKUPS, encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _log.addHandler(_handler)
+    _log.setLevel(logging.INFO)
+
+
+def _empty_totals() -> Dict[str, float]:
+    return {"calls": 0, "cached": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "queue_wait_ms": 0.0, "wall_ms": 0.0}
+
+
+class UsageTracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._requests: Dict[str, Dict[str, float]] = {}
+
+    def add_call(self, record: Dict[str, object]) -> None:
+        with self._lock:
+            totals = self._calls.setdefault(record["endpoint"], {}).setdefault(record["task"], _empty_totals())
+            totals["calls"] += 1
+            totals["cached"] += int(record["cached"])
+            totals["errors"] += int(record["error"] is not None)
+            totals["prompt_tokens"] += record["prompt_tokens"]
+            totals["completion_tokens"] += record["completion_tokens"]
+            totals["queue_wait_ms"] += record["queue_wait_ms"]
+            totals["wall_ms"] += record["wall_ms"]
+        if _log.handlers:
+            _log.info(json.dumps(record))
+
+    def add_request(self, endpoint: str, seconds: float) -> None:
+        """Count a finished request; only paths that have made LLM calls are tracked."""
+        with self._lock:
+            if endpoint not in self._calls:
+                return
+            totals = self._requests.setdefault(endpoint, {"requests": 0, "request_ms": 0.0})
+            totals["requests"] += 1
+            totals["request_ms"] += seconds * 1000
+
+    def stats(self) -> Dict[str, object]:
+        """Per endpoint: request count and time, and per prompt the LLM totals. Also totals per prompt."""
+        with self._lock:
+            endpoints = {}
+            by_task: Dict[str, Dict[str, float]] = {}
+            for endpoint, tasks in self._calls.items():
+                llm_ms = sum(t["wall_ms"] for t in tasks.values())
+                request = self._requests.get(endpoint, {"requests": 0, "request_ms": 0.0})
+                endpoints[endpoint] = {
+                    "requests": request["requests"],
+                    "request_ms": round(request["request_ms"]),
+                    "llm_ms": round(llm_ms),
+                    # Can pass 1.0 when one request makes concurrent calls
+                    "llm_share": round(llm_ms / request["request_ms"], 3) if request["request_ms"] else None,
+                    "tasks": {task: _rounded(totals) for task, totals in tasks.items()},
+                }
+                for task, totals in tasks.items():
+                    merged = by_task.setdefault(task, _empty_totals())
+                    for key, value in totals.items():
+                        merged[key] += value
+            return {"endpoints": endpoints, "tasks": {task: _rounded(t) for task, t in by_task.items()}}
+
+
+def _rounded(totals: Dict[str, float]) -> Dict[str, object]:
+    calls = totals["calls"] or 1
+    return {
+        **{key: round(value) for key, value in totals.items()},
+        "avg_wall_ms": round(totals["wall_ms"] / calls),
+        "avg_queue_wait_ms": round(totals["queue_wait_ms"] / calls),
+    }
+
+
+tracker = UsageTracker()
+
+
+class CallRecord:
+    """Accounting for one completion; created when the call starts, in the requesting context."""
+
+    def __init__(self, task: str, model: str):
+        self.task = task
+        self.model = model
+        self.endpoint = current_endpoint.get()
+        self.started = time.monotonic()
+        self.queue_wait = 0.0
+
+    def waited(self, seconds: float) -> None:
+        self.queue_wait += seconds
+
+    def done(self, prompt_tokens: int = 0, completion_tokens: int = 0, cached: bool = False,
+             hedged: bool = False, model: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        tracker.add_call({
+            "ts": round(time.time(), 3),
+            "endpoint": self.endpoint,
+            "task": self.task,
+            "model": model or self.model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "queue_wait_ms": round(self.queue_wait * 1000, 1),
+            "wall_ms": round((time.monotonic() - self.started) * 1000, 1),
+            "cached": cached,
+            "hedged": hedged,
+            "error": type(error).__name__ if error is not None else None,
+        })
+
+
+def stats() -> Dict[str, object]:
+    return tracker.stats()
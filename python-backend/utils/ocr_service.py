@@ -0,0 +1,209 @@
+"""OCR service shared by the resume parser and certificate verification.
+
+OCR engines (PaddleOCR, unstructured hi_res) only ever load inside a fixed pool of
+worker processes, never in the API process. Each worker loads PaddleOCR once when it
+starts and keeps it warm for every later job. At most OCR_WORKERS jobs run and
+OCR_QUEUE_SIZE more wait; beyond that, submit() blocks for up to OCR_QUEUE_TIMEOUT
+seconds and then raises OCRBusyError so callers can shed load instead of piling up.
+
+Workers are started with spawn, like the parse sandbox's children; see
+parse_sandbox.detach_main_script for keeping them from re-running the __main__ script.
+A process that starts the pool must call shutdown() before it exits, or exiting blocks
+on the idle workers.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from utils.parse_sandbox import apply_resource_limits
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", "8"))
+OCR_QUEUE_TIMEOUT = float(os.getenv("OCR_QUEUE_TIMEOUT", "5"))
+# Longest an endpoint waits for an OCR job's result
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", "60"))
+# Render resolution for the fast (PaddleOCR) path over PDF pages
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+# Per-worker limits; Paddle maps a lot of virtual memory, so RLIMIT_AS is off unless configured
+OCR_MEMORY_MB = int(os.getenv("OCR_MEMORY_MB", "0"))
+OCR_CPU_SECONDS = int(os.getenv("OCR_CPU_SECONDS", "120"))
+# Workers are replaced after this many jobs
+OCR_MAX_TASKS_PER_WORKER = int(os.getenv("OCR_MAX_TASKS_PER_WORKER", "100"))
+
+
+class OCRBusyError(RuntimeError):
+    """Raised when the OCR queue is full; the request should be retried later."""
+
+
+# --- Worker side ------------------------------------------------------------
+
+_paddle = None
+
+
+def _init_worker():
+    """Load PaddleOCR once per worker so jobs never pay the model start-up cost."""
+    global _paddle
+    apply_resource_limits(memory_mb=OCR_MEMORY_MB)
+    try:
+        from paddleocr import PaddleOCR
+        _paddle = PaddleOCR(use_angle_cls=True, lang="en")
+    except Exception as e:
+        # An initializer error would break the whole pool; hi_res jobs can still run without Paddle
+        print(f"[WARN] PaddleOCR unavailable in OCR worker: {e}")
+
+
+def _ocr_array(image) -> str:
+    if _paddle is None:
+        raise RuntimeError("PaddleOCR is not available")
+    results = _paddle.ocr(image)
+    return "\n".join(line[1][0] for line in (results[0] or []))
+
+
+def _ocr_image(image_bytes: bytes) -> str:
+    import numpy as np
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    # PaddleOCR expects BGR like cv2.imread
+    return _ocr_array(np.array(image)[:, :, ::-1])
+
+
+def _ocr_pdf_fast(pdf_bytes: bytes, page_numbers: List[int]) -> Dict[int, str]:
+    """Render each page and run PaddleOCR on it."""
+    import numpy as np
+    from utils.document_analysis import open_document
+
+    page_texts = {}
+    with open_document(pdf_bytes) as doc:
+        for number in page_numbers:
+            pix = doc[number].get_pixmap(dpi=OCR_DPI, colorspace="rgb", alpha=False)
+            image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+            page_texts[number] = _ocr_array(image[:, :, ::-1])
+    return page_texts
+
+
+def _ocr_pdf_hi_res(pdf_bytes: bytes, page_numbers: List[int]) -> Dict[int, str]:
+    """unstructured hi_res layout detection + OCR on just the given pages."""
+    from unstructured.partition.pdf import partition_pdf
+    from utils.document_analysis import extract_pages
+
+    elements = partition_pdf(
+        file=io.BytesIO(extract_pages(pdf_bytes, page_numbers)),
+        extract_images_in_pdf=True,
+        ocr_languages="eng",
+        strategy="hi_res"
+    )
+
+    # partition_pdf numbers pages of the subset from 1; map back to the original pages
+    page_texts = {number: [] for number in page_numbers}
+    for element in elements:
+        subset_page = (element.metadata.page_number or 1) - 1
+        page_texts[page_numbers[subset_page]].append(str(element))
+    return {number: "\n".join(texts) for number, texts in page_texts.items()}
+
+
+JOBS = {
+    "image": _ocr_image,
+    "fast": _ocr_pdf_fast,
+    "hi_res": _ocr_pdf_hi_res,
+}
+
+
+def _run_job(kind, *args):
+    # A runaway job gets SIGXCPU; the pool is then rebuilt by the API side
+    apply_resource_limits(cpu_seconds=OCR_CPU_SECONDS)
+    return JOBS[kind](*args)
+
+
+# --- API side ---------------------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(OCR_WORKERS + OCR_QUEUE_SIZE)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the workers must not inherit the API process's threads and sockets
+            _pool = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                max_tasks_per_child=OCR_MAX_TASKS_PER_WORKER,
+            )
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor):
+    """Drop a pool whose worker died (e.g. OOM-killed) so the next job starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def submit(kind: str, *args, queue_timeout: float = OCR_QUEUE_TIMEOUT) -> Future:
+    """Queue an OCR job ("image", "fast" or "hi_res") and return its Future."""
+    if not _slots.acquire(timeout=queue_timeout):
+        raise OCRBusyError(f"OCR queue is full ({OCR_WORKERS} running, {OCR_QUEUE_SIZE} waiting)")
+    pool = _get_pool()
+    try:
+        future = pool.submit(_run_job, kind, *args)
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        pool = _get_pool()
+        try:
+            future = pool.submit(_run_job, kind, *args)
+        except BaseException:
+            _slots.release()
+            raise
+    except BaseException:
+        _slots.release()
+        raise
+
+    def _done(f):
+        _slots.release()
+        if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool):
+            _reset_pool(pool)
+
+    future.add_done_callback(_done)
+    return future
+
+
+def _result(future: Future, timeout: Optional[float]):
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        # Frees the queue slot if the job has not started; a running job finishes in its worker
+        future.cancel()
+        raise
+
+
+def ocr_image(image_bytes: bytes, timeout: Optional[float] = None) -> str:
+    """OCR an image upload (JPEG/PNG) and return its text."""
+    return _result(submit("image", image_bytes), timeout)
+
+
+def ocr_pdf_pages(pdf_bytes: bytes, page_numbers: List[int], engine: str = "fast",
+                  timeout: Optional[float] = None) -> Dict[int, str]:
+    """OCR the given 0-based PDF pages; engine is "fast" (PaddleOCR) or "hi_res" (unstructured)."""
+    if not page_numbers:
+        return {}
+    return _result(submit(engine, bytes(pdf_bytes), list(page_numbers)), timeout)
+
+
+def shutdown(wait: bool = False):
+    """Stop the pool; with wait, block until its workers have exited."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
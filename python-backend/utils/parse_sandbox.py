@@ -0,0 +1,190 @@
+"""Run untrusted-document parsing in recycled child processes.
+
+A malformed or huge upload should cost one child process, not the API server. Each
+child runs with an address-space limit (RLIMIT_AS) and a per-job CPU-time limit
+(RLIMIT_CPU); the parent also kills it when a job exceeds its wall-clock timeout.
+Children talk to the parent over a multiprocessing Pipe and are replaced after
+SANDBOX_MAX_JOBS jobs so slow leaks in the parsers never accumulate.
+
+Children are started with spawn, which re-runs the parent's __main__ script in every child
+before it takes a job. A script that uses the sandbox must keep its startup code under
+if __name__ == "__main__", and one that loads heavy modules at import (main.py loads torch
+models) should call detach_main_script() so children skip it altogether.
+"""
+import math
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from importlib.machinery import ModuleSpec
+from typing import Optional
+
+
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", "2"))
+SANDBOX_MAX_JOBS = int(os.getenv("SANDBOX_MAX_JOBS", "50"))
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "1024"))
+SANDBOX_CPU_SECONDS = int(os.getenv("SANDBOX_CPU_SECONDS", "30"))
+SANDBOX_TIMEOUT = float(os.getenv("SANDBOX_TIMEOUT", "45"))
+
+
+class SandboxError(RuntimeError):
+    """The job raised, or its child process died (memory or CPU limit, crash)."""
+
+
+class SandboxTimeout(SandboxError):
+    """The job ran past its wall-clock timeout and the child was killed."""
+
+
+def detach_main_script():
+    """Stop spawned children (parse sandbox, OCR pool) from re-running the __main__ script.
+
+    Jobs are top-level functions of importable modules, so children never need the
+    script. A __main__ whose spec is named "__main__" is one multiprocessing leaves alone
+    in the child, so the child imports only what unpickling its job requires and its
+    memory limit applies to a small process.
+    """
+    main = sys.modules["__main__"]
+    if getattr(main, "__spec__", None) is None:
+        main.__spec__ = ModuleSpec("__main__", None)
+
+
+def apply_resource_limits(memory_mb: int = 0, cpu_seconds: int = 0):
+    """Cap this process's address space and the CPU time it may use from now on (0 = no limit).
+
+    Only the soft CPU limit is set, relative to the CPU already used, so a long-lived
+    worker can call this again before every job.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows: no rlimits, the wall-clock kill still applies
+        return
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime) + cpu_seconds
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, memory_mb):
+    apply_resource_limits(memory_mb=memory_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        func, args, cpu_seconds = job
+        apply_resource_limits(cpu_seconds=cpu_seconds)
+        try:
+            reply = ("ok", func(*args))
+        except MemoryError:
+            # The heap may be in a bad state after hitting RLIMIT_AS; the parent retires this child
+            reply = ("fatal", "out of memory")
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except Exception as e:  # unpicklable result
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Child:
+    def __init__(self, context, memory_mb):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ParseSandbox:
+    """A small pool of limited child processes; run() blocks until a child is free."""
+
+    def __init__(self, workers: int = SANDBOX_WORKERS, max_jobs: int = SANDBOX_MAX_JOBS,
+                 memory_mb: int = SANDBOX_MEMORY_MB, cpu_seconds: int = SANDBOX_CPU_SECONDS,
+                 timeout: float = SANDBOX_TIMEOUT):
+        self.max_jobs = max_jobs
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.timeout = timeout
+        # spawn: children must not inherit the API process's threads, sockets or model state
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(workers)
+        self._idle = queue.LifoQueue()
+
+    def _take(self) -> _Child:
+        try:
+            child = self._idle.get_nowait()
+            if child.process.is_alive():
+                return child
+            child.kill()
+        except queue.Empty:
+            pass
+        return _Child(self._context, self.memory_mb)
+
+    def run(self, func, *args, timeout: Optional[float] = None):
+        """Call func(*args) in a child; func and args must be picklable (top-level functions)."""
+        timeout = self.timeout if timeout is None else timeout
+        with self._slots:
+            child = self._take()
+            try:
+                child.conn.send((func, args, self.cpu_seconds))
+                if not child.conn.poll(timeout):
+                    raise SandboxTimeout(f"{getattr(func, '__name__', func)} exceeded {timeout:.0f}s")
+                status, value = child.conn.recv()
+            except SandboxTimeout:
+                child.kill()
+                raise
+            except (EOFError, OSError) as e:
+                child.kill()
+                # -9 is RLIMIT_AS/OOM killer, -24 (SIGXCPU) is the CPU limit
+                raise SandboxError(f"parser process died (exit code {child.process.exitcode})") from e
+
+            child.jobs += 1
+            if status == "fatal" or child.jobs >= self.max_jobs:
+                child.stop()
+            else:
+                self._idle.put(child)
+
+        if status != "ok":
+            raise SandboxError(value)
+        return value
+
+    def shutdown(self):
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+
+sandbox = ParseSandbox()
+
+
+def run_sandboxed(func, *args, timeout: Optional[float] = None):
+    return sandbox.run(func, *args, timeout=timeout)
+
+
+def shutdown():
+    sandbox.shutdown()
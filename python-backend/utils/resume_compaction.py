@@ -0,0 +1,99 @@
+import os
+import re
+import unicodedata
+from typing import Dict, Tuple
+
+
+# Upper bound on resume tokens sent to the extraction prompt
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "3000"))
+# Shorter lines ("Present", "Java", a city) legitimately repeat and are never de-duplicated
+DEDUPE_MIN_CHARS = 15
+
+BOILERPLATE_PATTERNS = [
+    re.compile(r"^page\s*\d+(\s*(of|/)\s*\d+)?$", re.I),
+    re.compile(r"^(curriculum\s+vitae|resume|résumé|cv|bio[\s-]?data)$", re.I),
+    re.compile(r"^references?\s+(are\s+)?(available\s+)?(up)?on\s+request\.?$", re.I),
+    re.compile(r"^i\s+(hereby\s+)?declare\s+that\b.*", re.I),
+    re.compile(r"^(place|date)\s*[:\-]?\s*$", re.I),
+]
+
+_encoding = None
+
+
+def _get_encoding():
+    """cl100k_base, loaded once; False if tiktoken (or its BPE download) is unavailable."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"[WARN] tiktoken unavailable, estimating tokens from length: {e}")
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken's cl100k_base; close enough to Llama's tokenizer for budgeting."""
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    # The usual ~4 characters per token
+    return (len(text) + 3) // 4
+
+
+def _normalize_line(line: str) -> str:
+    line = unicodedata.normalize("NFKC", line).replace("\u200b", "")
+    line = re.sub(r"\s+", " ", line).strip()
+    # Bullet glyphs carry no information for the extractor
+    return re.sub(r"^[•·▪●◦➢➤✓*\-–—]+\s*", "", line)
+
+
+def _is_junk(line: str) -> bool:
+    """Separator rules and OCR noise: lines that are mostly not letters or digits."""
+    if not line:
+        return True
+    alnum = sum(ch.isalnum() for ch in line)
+    return len(line) > 3 and alnum / len(line) < 0.3
+
+
+def compact_resume_text(text: str, max_tokens: int = RESUME_TOKEN_BUDGET) -> Tuple[str, Dict[str, int]]:
+    """Normalise whitespace, drop repeated lines and boilerplate, then enforce a token budget.
+
+    Returns the compacted text and before/after statistics.
+    """
+    raw_lines = text.splitlines()
+    kept = []
+    seen = set()
+    for raw in raw_lines:
+        line = _normalize_line(raw)
+        if _is_junk(line) or any(p.match(line) for p in BOILERPLATE_PATTERNS):
+            continue
+        if len(line) >= DEDUPE_MIN_CHARS:
+            key = line.casefold()
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+
+    # Keep whole lines in reading order until the budget runs out
+    budgeted = []
+    used = 0
+    truncated = False
+    for line in kept:
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            truncated = True
+            break
+        budgeted.append(line)
+        used += cost
+
+    compacted = "\n".join(budgeted)
+    stats = {
+        "tokens_before": count_tokens(text),
+        "tokens_after": count_tokens(compacted),
+        "lines_before": len(raw_lines),
+        "lines_after": len(budgeted),
+        "truncated": truncated,
+    }
+    return compacted, stats
@@ -0,0 +1,104 @@
+import re
+from statistics import median
+from typing import Dict, Iterable, List, Optional
+
+from utils.document_analysis import DocumentAnalysis
+
+
+# Canonical section -> heading phrases seen in our intake (matched after lower-casing and stripping punctuation)
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "objective", "career objective", "about me",
+                "professional summary", "profile summary", "experience summary"],
+    "skills": ["skills", "technical skills", "key skills", "core skills", "skill set", "skillset",
+               "core competencies", "key competencies", "competencies", "technologies", "tech stack", "tools",
+               "programming languages", "technical expertise", "it skills"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internship", "internships",
+                   "career history", "experience details"],
+    "education": ["education", "academic", "academics", "qualification", "qualifications",
+                  "educational qualification", "educational qualifications",
+                  "academic qualification", "academic qualifications", "academic details"],
+    "projects": ["projects", "project", "academic projects", "personal projects",
+                 "key projects", "project details", "projects undertaken", "college project",
+                 "college projects"],
+    "certifications": ["certifications", "certification", "certificates", "courses",
+                       "achievements", "awards", "achievements and awards", "honors",
+                       "licenses and certifications", "awards and certifications"],
+}
+
+# What each downstream call actually reads
+SCORING_SECTIONS = ("skills", "experience", "projects", "certifications")
+
+_HEADING_LOOKUP = {
+    phrase: section for section, phrases in SECTION_HEADINGS.items() for phrase in phrases
+}
+MAX_HEADING_WORDS = 5
+
+
+def match_heading(line: str) -> Optional[str]:
+    """Canonical section name if the line reads like a section heading, else None."""
+    line = line.strip()
+    # Letter-spaced designs ("S K I L L S", "W O R K  E X P E R I E N C E")
+    if re.fullmatch(r"\S( {1,2}\S){2,}", line):
+        line = " ".join(word.replace(" ", "") for word in re.split(r" {2,}", line))
+    # Parenthetical notes ("Work Experience (2 Years)") are not part of the heading
+    line = re.sub(r"\(.*?\)", " ", line)
+    words = re.sub(r"[^a-z& ]+", " ", line.lower().replace("&", " and ")).split()
+    if not words or len(words) > MAX_HEADING_WORDS:
+        return None
+    return _HEADING_LOOKUP.get(" ".join(words))
+
+
+def _split(entries: Iterable[tuple]) -> Dict[str, str]:
+    """Group (text, section-or-None) entries under the most recent heading.
+
+    Text before the first heading (name, contact block) goes under "header".
+    """
+    sections: Dict[str, List[str]] = {}
+    current = "header"
+    for text, heading in entries:
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+            continue
+        if text.strip():
+            sections.setdefault(current, []).append(text.strip())
+    return {name: "\n".join(lines) for name, lines in sections.items() if lines}
+
+
+def segment_layout(analysis: DocumentAnalysis) -> Dict[str, str]:
+    """Split a PDF into sections using font size and weight from the text layer.
+
+    A line only counts as a heading if its wording matches a known section and it
+    stands out typographically (larger than body text, bold, or all caps), so a
+    sentence like "Skills" inside a bullet list does not start a new section.
+    """
+    lines = [line for page in analysis.pages for line in page.lines]
+    sizes = [line.size for line in lines if line.text.strip()]
+    if not sizes:
+        return {}
+    body_size = median(sizes)
+
+    def heading_of(line) -> Optional[str]:
+        section = match_heading(line.text)
+        if section is None:
+            return None
+        letters = re.sub(r"[^A-Za-z]", "", line.text)
+        stands_out = line.size >= body_size * 1.1 or line.bold or (letters and letters.isupper())
+        return section if stands_out else None
+
+    return _split((line.text, heading_of(line)) for line in lines)
+
+
+def segment_text(text: str) -> Dict[str, str]:
+    """Section split for plain text (DOCX, DOC, OCR output) where no font information survives."""
+    return _split((line, match_heading(line)) for line in text.splitlines())
+
+
+def select_sections(sections: Dict[str, str], names: Iterable[str]) -> str:
+    """Render just the requested sections, in the order given, as labelled blocks."""
+    blocks = []
+    for name in names:
+        if sections.get(name):
+            blocks.append(f"{name.title()}:\n{sections[name]}")
+    return "\n\n".join(blocks)
@@ -0,0 +1,85 @@
+"""Single-flight coalescing of identical in-flight work.
+
+When the same resume is scored from several tabs at once, or a client retries while
+the first request is still running, only the first caller (the leader) does the work;
+the others wait for it and share its result or exception. Keys are the same content
+hashes the caches use, so once the leader finishes, later callers hit the cache instead.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) unless a call with this key is already running; then wait for it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Async variant: concurrent awaits with the same key share one task."""
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                self._tasks[key] = task
+                task.add_done_callback(lambda _: self._forget(key, task))
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        # A caller that disconnects must not cancel the work the others are waiting on
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._tasks),
+            }
+
+
+# Shared by the parse, extraction, scoring and LLM paths; their keys are salted differently
+inflight = SingleFlight()